@@ -0,0 +1,225 @@
+"""
+Headless HTTP API for the CV chatbot, next to the Streamlit UI.
+    
+    python api.py
+
+Endpoints:
+    POST /api/session      {"password": ...} -> {"token": ..., "expires_in": ...}
+    POST /api/chat         {"message": ..., "history": [...], "profile": ...} -> answer JSON
+    POST /api/chat/stream  same body -> server-sent events "text", then "done" or "error"
+    GET  /api/chat/stream  ?message=...&session=... for EventSource clients
+    GET  /api/health
+
+Chat endpoints take the session token as "Authorization: Bearer <token>"
+(or ?session= for EventSource, which cannot set headers). The server runs
+in its own process on the async engine loop; chatbots, in-flight request
+coalescing, the paraphrase cache and the circuit breaker are per process.
+Only the SQLite answer cache and rate limiter are shared with a Streamlit
+app on the same machine.
+"""
+import json
+import asyncio
+import functools
+from typing import List, Dict, Any, Optional, Tuple
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+from backend.auth import AuthManager, AuthThrottled, resolve_client_address
+from backend.registry import get_current_chatbot, get_tenant, get_async_chatbot, get_engine, get_rate_limiter
+from backend.rate_limit import billed_tokens
+from config.settings import (
+    API_HOST, API_PORT, API_MAX_MESSAGE_CHARS, MAX_CONVERSATION_LENGTH, MULTI_TENANT_ENABLED, RATE_LIMIT_ENABLED
+)
+
+auth_manager = AuthManager()
+
+class APIError(Exception):
+    """Error returned to the client as {"error": message} with the given status."""
+    
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers
+
+def client_address(request: Request) -> Optional[str]:
+    """Client address for login throttling and rate limits, see resolve_client_address()."""
+    peer = request.client.host if request.client else None
+    return resolve_client_address(peer, request.headers.get("x-forwarded-for"))
+
+def authenticate(request: Request) -> str:
+    """Return the request's valid session token or raise a 401."""
+    header = request.headers.get("authorization", "")
+    token = header[7:] if header.lower().startswith("bearer ") else request.query_params.get("session")
+    if auth_manager.validate_session_token(token) is None:
+        raise APIError(401, "Missing, invalid or expired session token")
+    return token
+
+async def read_json(request: Request) -> Dict[str, Any]:
+    try:
+        body = await request.json()
+    except Exception:
+        raise APIError(400, "Request body must be JSON")
+    if not isinstance(body, dict):
+        raise APIError(400, "Request body must be a JSON object")
+    return body
+
+def parse_turn(params: Dict[str, Any]) -> Tuple[str, List[Dict[str, str]]]:
+    """
+    Validate message and history of a chat request.
+    
+    There is no rolling summary as in the Streamlit app: it is sent in a
+    system block, which must not take text from clients.
+    """
+    message = params.get("message")
+    if not isinstance(message, str) or not message.strip():
+        raise APIError(400, "'message' must be a non-empty string")
+    if len(message) > API_MAX_MESSAGE_CHARS:
+        raise APIError(400, f"'message' is limited to {API_MAX_MESSAGE_CHARS} characters")
+    
+    history = params.get("history") or []
+    if not isinstance(history, list) or not all(
+        isinstance(msg, dict) and msg.get("role") in ("user", "assistant") and isinstance(msg.get("content"), str)
+        for msg in history
+    ):
+        raise APIError(400, "'history' must be a list of {\"role\": \"user\"|\"assistant\", \"content\": ...}")
+    # Only the most recent turns can be used anyway
+    history = [{"role": msg["role"], "content": msg["content"]} for msg in history[-MAX_CONVERSATION_LENGTH:]]
+    return message, history
+
+def off_loop(func, *args) -> asyncio.Future:
+    """
+    Run a blocking call in a worker thread.
+    
+    The server shares its event loop with every upstream call of the
+    process, so building a chatbot, reading a profile or a SQLite
+    transaction waiting for another process must not run on it.
+    """
+    return asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+async def chatbot_for(profile: Optional[str]):
+    """The async chatbot serving this request's profile."""
+    if not MULTI_TENANT_ENABLED:
+        return get_async_chatbot(await off_loop(get_current_chatbot))
+    tenant = await off_loop(get_tenant, profile)
+    if tenant is None:
+        raise APIError(404, "Unknown or missing profile")
+    return get_async_chatbot(tenant[1])
+
+def rate_limit_identities(request: Request, token: str) -> List[str]:
+    """
+    Buckets a request draws from: its session token and, since tokens are
+    cheap to renew, the client address if it can be trusted (behind a proxy
+    every client would share one bucket).
+    """
+    identities = [f"token:{token}"]
+    address = client_address(request)
+    if address:
+        identities.append(f"client:{address}")
+    return identities
+
+async def check_rate_limit(identities: List[str]):
+    if not RATE_LIMIT_ENABLED:
+        return
+    decision = await off_loop(lambda: get_rate_limiter().check(identities))
+    if not decision.allowed:
+        retry_after = str(int(decision.retry_after))
+        raise APIError(429, f"Rate limit exceeded ({decision.reason})", {"Retry-After": retry_after})
+
+def charge(identities: List[str], tokens_used: Dict[str, int]):
+    """
+    Charge the upstream usage of a turn; passed to the chatbot as on_usage.
+    
+    The chatbot calls it in a worker thread once the upstream call started
+    by this request completes, even if the client disconnected in the
+    meantime. Requests joining another client's call are not charged.
+    """
+    if RATE_LIMIT_ENABLED:
+        get_rate_limiter().charge_tokens(identities, billed_tokens(tokens_used))
+
+def public_result(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Response fields of a final event, without the type marker."""
+    return {key: value for key, value in event.items() if key != "type"}
+
+async def create_session(request: Request) -> JSONResponse:
+    body = await read_json(request)
+    password = body.get("password")
+    if not isinstance(password, str):
+        raise APIError(400, "'password' must be a string")
+    
+    try:
+        # verify_password waits for the bcrypt pool; do not block the event loop on it
+        valid = await off_loop(auth_manager.verify_password, password, client_address(request))
+    except AuthThrottled as e:
+        raise APIError(429, str(e), {"Retry-After": str(int(e.retry_after) + 1)})
+    if not valid:
+        raise APIError(401, "Invalid password")
+    return JSONResponse({"token": auth_manager.issue_session_token(), "expires_in": auth_manager.session_timeout})
+
+async def chat(request: Request) -> JSONResponse:
+    token = authenticate(request)
+    body = await read_json(request)
+    message, history = parse_turn(body)
+    async_chatbot = await chatbot_for(body.get("profile"))
+    identities = rate_limit_identities(request, token)
+    await check_rate_limit(identities)
+    
+    result = None
+    on_usage = functools.partial(charge, identities)
+    async for event in async_chatbot.stream_shared(message, history, streaming=False, on_usage=on_usage):
+        if event["type"] != "text":
+            result = public_result(event)
+    return JSONResponse(result, status_code=200 if result["success"] else 502)
+
+async def chat_stream(request: Request) -> StreamingResponse:
+    token = authenticate(request)
+    params = await read_json(request) if request.method == "POST" else dict(request.query_params)
+    message, history = parse_turn(params)
+    async_chatbot = await chatbot_for(params.get("profile"))
+    identities = rate_limit_identities(request, token)
+    await check_rate_limit(identities)
+    
+    async def events():
+        on_usage = functools.partial(charge, identities)
+        async for event in async_chatbot.stream_shared(message, history, on_usage=on_usage):
+            data = {"text": event["text"]} if event["type"] == "text" else public_result(event)
+            yield f"event: {event['type']}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def health(request: Request) -> JSONResponse:
+    return JSONResponse({"status": "ok", "engine": get_engine().stats()})
+
+async def handle_api_error(request: Request, error: APIError) -> JSONResponse:
+    return JSONResponse({"error": str(error)}, status_code=error.status, headers=error.headers)
+
+app = Starlette(
+    routes=[
+        Route("/api/session", create_session, methods=["POST"]),
+        Route("/api/chat", chat, methods=["POST"]),
+        Route("/api/chat/stream", chat_stream, methods=["GET", "POST"]),
+        Route("/api/health", health, methods=["GET"])
+    ],
+    exception_handlers={APIError: handle_api_error}
+)
+
+def main():
+    """Serve the API on the shared async engine loop."""
+    engine = get_engine()
+    # loop="none": uvicorn runs on the engine loop instead of creating its own,
+    # so handlers can await the async chatbot directly
+    server = uvicorn.Server(uvicorn.Config(app, host=API_HOST, port=API_PORT, loop="none", lifespan="off"))
+    future = engine.submit(server.serve())
+    try:
+        future.result()
+    except KeyboardInterrupt:
+        server.should_exit = True
+        future.result(timeout=10)
+
+if __name__ == "__main__":
+    main()
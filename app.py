@@ -1,14 +1,19 @@
 import streamlit as st
 import os
 import time
-from dotenv import load_dotenv
-from backend.auth import AuthManager
-from backend.chatbot import CVChatbot
+import uuid
+from functools import lru_cache
+from typing import Optional
+from backend.assets import build_stylesheet, minified_stylesheet
+from backend.auth import AuthManager, AuthThrottled, resolve_client_address
+from backend.registry import get_current_chatbot, get_tenant, get_async_chatbot, get_summarizer, get_rate_limiter
+from backend.rate_limit import RateLimitDecision, billed_tokens
+from backend.summarizer import SummaryState
 from backend.prompts import get_welcome_message, get_suggested_questions
-from config.settings import load_cv_data, APP_TITLE, APP_ICON
-
-# Load environment variables
-load_dotenv()
+from config.settings import (
+    APP_TITLE, APP_ICON, MAX_FRAGMENT_MESSAGES, MULTI_TENANT_ENABLED, RATE_LIMIT_ENABLED, MAX_REQUESTS_PER_HOUR, MAX_TOKENS_PER_DAY,
+    STYLESHEET_SOURCE, STATIC_DIR, FONTS_URL
+)
 
 # Page configuration
 st.set_page_config(
@@ -18,415 +23,25 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# Custom CSS for styling
-st.markdown("""
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
-    
-    /* Main container styling - MHP inspired minimal white design */
-    .stApp {
-        background-color: #ffffff;
-        font-family: 'Inter', sans-serif;
-    }
-    
-    /* Override Streamlit's default styling */
-    .main .block-container {
-        padding-top: 3rem !important;
-        padding-bottom: 140px !important;
-        max-width: 1000px !important;
-    }
-    
-    /* Chat message styling */
-    .chat-message {
-        padding: 1.5rem;
-        border-radius: 12px;
-        margin-bottom: 1.5rem;
-        animation: fadeIn 0.3s ease-in;
-        box-shadow: 0 2px 8px rgba(0, 0, 0, 0.05);
-        font-size: 16px;
-        line-height: 1.6;
-    }
-    
-    .user-message {
-        background-color: #f8fafc;
-        margin-left: 10%;
-        border-left: 3px solid #1612ff;
-        color: #262626;
-    }
-    
-    .assistant-message {
-        background-color: #ffffff;
-        margin-right: 10%;
-        border-left: 3px solid #e2e8f0;
-        border: 1px solid #d1d5db;
-        color: #262626;
-    }
-    
-    /* Hide Streamlit default elements */
-    #MainMenu {visibility: hidden;}
-    footer {visibility: hidden;}
-    header {visibility: hidden;}
-    
-    /* Custom button styling - Enhanced contrast */
-    .stButton > button {
-        background: linear-gradient(135deg, #2563eb 0%, #1d4ed8 100%);
-        color: #ffffff !important;
-        border-radius: 12px;
-        border: none;
-        padding: 0.875rem 1.75rem;
-        font-weight: 500;
-        font-family: 'Inter', sans-serif;
-        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-        box-shadow: 0 4px 12px rgba(37, 99, 235, 0.2);
-        font-size: 16px;
-    }
-    
-    .stButton > button:hover {
-        background: linear-gradient(135deg, #1d4ed8 0%, #1e40af 100%);
-        transform: translateY(-2px);
-        box-shadow: 0 8px 20px rgba(37, 99, 235, 0.35);
-        color: #ffffff !important;
-    }
-    
-    .stButton > button:active {
-        transform: translateY(0px);
-        box-shadow: 0 2px 8px rgba(37, 99, 235, 0.25);
-    }
-    
-    /* Authentication container */
-    .auth-container {
-        background-color: #ffffff;
-        padding: 3rem;
-        border-radius: 16px;
-        box-shadow: 0 10px 40px rgba(0, 0, 0, 0.1);
-        margin: 3rem auto;
-        max-width: 480px;
-        border: 1px solid #d1d5db;
-    }
-    
-    /* Add "Login" text to empty auth container */
-    .auth-container:empty::before {
-        content: "Login";
-        font-size: 2rem;
-        font-weight: 600;
-        color: #1e293b;
-        display: block;
-        text-align: center;
-        font-family: 'Inter', sans-serif;
-    }
-    
-    /* Welcome message styling */
-    .welcome-message {
-        background-color: #f8fafc;
-        padding: 2rem;
-        border-radius: 12px;
-        border-left: 4px solid #1612ff;
-        margin-bottom: 2rem;
-        color: #262626;
-        font-size: 16px;
-        line-height: 1.6;
-    }
-    
-    /* Typography improvements - FORCE VISIBLE COLORS */
-    h1, .stMarkdown h1, [data-testid="stMarkdownContainer"] h1 {
-        color: #1e293b !important;
-        font-weight: 600 !important;
-        margin-bottom: 1rem !important;
-    }
-    
-    h2, .stMarkdown h2, [data-testid="stMarkdownContainer"] h2 {
-        color: #1e293b !important;
-        font-weight: 600 !important;
-    }
-    
-    h3, .stMarkdown h3, [data-testid="stMarkdownContainer"] h3 {
-        color: #374151 !important;
-        font-weight: 500 !important;
-    }
-    
-    /* Increase font sizes across the app */
-    .stMarkdown p, .stMarkdown li, .stMarkdown span {
-        font-size: 18px !important;
-        color: #374151;
-    }
-    
-    /* Welcome message text */
-    .welcome-message p, .welcome-message li {
-        font-size: 18px !important;
-    }
-    
-    /* Button text larger */
-    button p, button span {
-        font-size: 16px !important;
-    }
-    
-    /* General content text */
-    [data-testid="stMarkdownContainer"] p {
-        font-size: 18px !important;
-    }
-    
-    /* Bullet points */
-    ul li, ol li {
-        font-size: 18px !important;
-    }
-    
-    /* Fix specific problematic elements with larger text */
-    .stMarkdown > div, .stMarkdown p, .stMarkdown span {
-        color: #374151 !important;
-        font-size: 17px !important;
-    }
-    
-    /* Force larger text on all containers */
-    .element-container, .element-container * {
-        font-size: 17px !important;
-    }
-    
-    /* TARGET EXACT STREAMLIT BUTTON STRUCTURE */
-    
-    /* Target the button with exact classes */
-    .st-emotion-cache-1rwb540.el4r43z2 {
-        background: #2563eb !important;
-        color: #ffffff !important;
-        border: 1px solid #2563eb !important;
-        border-radius: 8px !important;
-    }
-    
-    /* Target the markdown container inside button */
-    .st-emotion-cache-1rwb540 .st-emotion-cache-bvleps {
-        color: #ffffff !important;
-    }
-    
-    /* Target the p tag specifically */
-    .st-emotion-cache-1rwb540 .st-emotion-cache-bvleps p {
-        color: #ffffff !important;
-    }
-    
-    /* Target by test ID */
-    [data-testid="stBaseButton-secondary"] {
-        background: #2563eb !important;
-        color: #ffffff !important;
-    }
-    
-    [data-testid="stBaseButton-secondary"] p {
-        color: #ffffff !important;
-    }
-    
-    /* Target all secondary buttons */
-    button[kind="secondary"] {
-        background: #2563eb !important;
-        color: #ffffff !important;
-    }
-    
-    button[kind="secondary"] p {
-        color: #ffffff !important;
-    }
-    
-    /* Sidebar styling */
-    .css-1d391kg {
-        background-color: #f8fafc;
-    }
-    
-    /* Input styling - Fixed overlapping issue */
-    .stTextInput > div > div > input {
-        border-radius: 12px;
-        border: 1px solid #cbd5e1;
-        padding: 0.875rem 1rem;
-        font-family: 'Inter', sans-serif;
-        background-color: #ffffff !important;
-        color: #1e293b !important;
-        font-size: 16px;
-        font-weight: 400;
-        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-        box-shadow: 0 2px 4px rgba(0, 0, 0, 0.04);
-        width: 100% !important;
-    }
-    
-    /* Hide the dark overlapping helper text */
-    .stTextInput > div > div[data-baseweb="base-input"] > div:last-child {
-        display: none !important;
-    }
-    
-    .stTextInput > div > div > input:focus {
-        border-color: #2563eb !important;
-        box-shadow: 0 0 0 3px rgba(37, 99, 235, 0.15) !important;
-        background-color: #ffffff !important;
-        outline: none !important;
-    }
-    
-    .stTextInput > div > div > input::placeholder {
-        color: #64748b !important;
-        font-weight: 400;
-    }
-    
-    /* Fix input container positioning */
-    .stTextInput > div {
-        position: relative !important;
-    }
-    
-    .stTextInput > div > div {
-        width: 100% !important;
-        position: relative !important;
-    }
-    
-    /* Enhanced Chat Input - More Visible with Shadow */
-    [data-testid="stChatInput"] {
-        background: #ffffff !important;
-        border-radius: 20px !important;
-        box-shadow: 
-            0 8px 25px rgba(0, 0, 0, 0.1),
-            0 4px 10px rgba(0, 0, 0, 0.06) !important;
-        border: 2px solid #e2e8f0 !important;
-        margin: 24px auto !important;
-        max-width: 900px !important;
-        padding: 8px !important;
-    }
-    
-    [data-testid="stChatInput"] > div {
-        border: none !important;
-        background: transparent !important;
-    }
-    
-    [data-testid="stChatInput"] input {
-        background: #ffffff !important;
-        color: #1e293b !important;
-        font-family: 'Inter', sans-serif !important;
-        border-radius: 16px !important;
-        border: none !important;
-        padding: 18px 24px !important;
-        font-size: 17px !important;
-        min-height: 48px !important;
-    }
-    
-    
-    
-    /* MAKE DARK ELEMENTS LIGHT GREY INSTEAD */
-    .stCode, [data-testid="stCode"],
-    .stCodeBlock, [data-testid="stCodeBlock"],
-    pre, code,
-    div[style*="background-color: rgb(0, 0, 0)"],
-    div[style*="background-color: black"],
-    div[style*="background: rgb(0, 0, 0)"],
-    div[style*="background: black"] {
-        background-color: #f1f5f9 !important;
-        background: #f1f5f9 !important;
-        color: #374151 !important;
-        border: 1px solid #e2e8f0 !important;
-    }
-    
-    /* Target the BLACK bottom container and all chat elements */
-    [data-testid="stBottomBlockContainer"],
-    .st-emotion-cache-1y34ygi,
-    .st-emotion-cache-8fjoqp,
-    .st-emotion-cache-1eeryuo,
-    .st-emotion-cache-x1bvup,
-    .st-emotion-cache-12o5wl7,
-    .st-emotion-cache-sey4o0,
-    .st-emotion-cache-1d0j37u,
-    .st-emotion-cache-vsnu81,
-    [data-testid="stChatInput"],
-    [data-testid="stChatInput"] *,
-    [data-testid="stVerticalBlock"] {
-        background-color: #f8fafc !important;
-        border-color: #f1f5f9 !important;
-        background: #f8fafc !important;
-    }
-    
-    /* Make textarea area bigger and more visible */
-    [data-testid="stChatInputTextArea"] {
-        background-color: #ffffff !important;
-        color: #1e293b !important;
-        padding: 18px 24px !important;
-        font-size: 17px !important;
-        min-height: 48px !important;
-        border-radius: 16px !important;
-    }
-    
-    /* Light submit button */
-    [data-testid="stChatInputSubmitButton"] {
-        background-color: #f1f5f9 !important;
-        color: #64748b !important;
-    }
-    
-    /* Fix dark text input helper areas */
-    .stTextInput div[style*="background: rgb"],
-    div[data-baseweb="base-input"] > div {
-        background: #f8fafc !important;
-        color: #374151 !important;
-    }
-    
-    /* Keep main app backgrounds white but don't touch chat input */
-    
-    .stApp {
-        background-color: #ffffff !important;
-        color: #1e293b !important;
-    }
-    
-    .main .block-container {
-        background-color: #ffffff !important;
-        color: #1e293b !important;
-    }
-    
-    /* AGGRESSIVE TEXT COLOR FIXES */
-    .element-container, .stMarkdown, [data-testid="stMarkdownContainer"],
-    .block-container, .main, .stApp > div, .css-1d391kg,
-    .stForm, .stColumns, .stColumn, .stContainer {
-        color: #1e293b !important;
-    }
-    
-    /* Force visible colors on ALL content */
-    .element-container * {
-        color: #374151 !important;
-    }
-    
-    /* Specifically target white text issues */
-    .stApp h1, .stApp h2, .stApp h3, .stApp h4, .stApp h5, .stApp h6,
-    .stApp p, .stApp span, .stApp div, .stApp label, .stApp text {
-        color: #1e293b !important;
-    }
-    
-    /* Fix markdown container text */
-    [data-testid="stMarkdownContainer"] * {
-        color: #374151 !important;
-    }
-    
-    /* Enhanced animations */
-    @keyframes fadeIn {
-        from { 
-            opacity: 0; 
-            transform: translateY(20px) scale(0.95); 
-        }
-        to { 
-            opacity: 1; 
-            transform: translateY(0) scale(1); 
-        }
-    }
-    
-    @keyframes slideUp {
-        from {
-            opacity: 0;
-            transform: translateY(30px);
-        }
-        to {
-            opacity: 1;
-            transform: translateY(0);
-        }
-    }
-    
-    @keyframes pulse {
-        0%, 100% { transform: scale(1); }
-        50% { transform: scale(1.02); }
-    }
-    
-    /* Apply animations to elements */
-    .chat-message {
-        animation: slideUp 0.4s cubic-bezier(0.4, 0, 0.2, 1);
-    }
-    
-    .stButton > button:hover {
-        animation: pulse 0.3s ease-in-out;
-    }
-</style>
-""", unsafe_allow_html=True)
+# Custom CSS for styling: links to the minified, fingerprinted stylesheet,
+# which the browser fetches once instead of receiving it on every run.
+# Without static file serving, or if the static directory cannot be
+# written (e.g. a read-only deployment), the minified styles are inlined.
+stylesheet = None
+if st.get_option("server.enableStaticServing"):
+    try:
+        stylesheet = build_stylesheet(STYLESHEET_SOURCE, STATIC_DIR)
+    except OSError as e:
+        print(f"Error building stylesheet, inlining it instead: {e}")
+if stylesheet is not None:
+    styles = f'<link rel="stylesheet" href="app/static/{stylesheet}">'
+else:
+    try:
+        styles = f"<style>{minified_stylesheet(STYLESHEET_SOURCE)}</style>"
+    except OSError as e:
+        print(f"Error reading stylesheet: {e}")
+        styles = ""
+st.markdown(f'<link rel="stylesheet" href="{FONTS_URL}">{styles}', unsafe_allow_html=True)
 
 def initialize_session_state():
     """Initialize session state variables."""
@@ -440,21 +55,86 @@ def initialize_session_state():
         st.session_state.messages = []
     if "total_tokens_used" not in st.session_state:
         st.session_state.total_tokens_used = 0
-    if "chatbot" not in st.session_state:
-        cv_data = load_cv_data()
-        st.session_state.chatbot = CVChatbot(cv_data)
+    if "summary_state" not in st.session_state:
+        st.session_state.summary_state = SummaryState()
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    refresh_chatbot()
+
+def refresh_chatbot():
+    """
+    Point the session at the current process-wide chatbot; sessions do not own a copy.
+    
+    Called on every run and before every turn (chat fragment reruns skip
+    main()), so a reloaded CV is used from the next question on.
+    """
+    if MULTI_TENANT_ENABLED:
+        tenant = get_tenant(st.query_params.get("profile"))
+        st.session_state.profile, st.session_state.chatbot = tenant if tenant else (None, None)
+    else:
+        st.session_state.profile = None
+        st.session_state.chatbot = get_current_chatbot()
+
+def page_heading() -> str:
+    """Title line of the current profile."""
+    profile = st.session_state.profile
+    if profile is not None:
+        return f"# {profile.icon} {profile.title}"
+    return f"# {APP_ICON} {APP_TITLE}"
+
+def client_address() -> Optional[str]:
+    """Client address for login throttling and rate limits, see resolve_client_address()."""
+    if not hasattr(st.context, "ip_address"):
+        # Added in Streamlit 1.45
+        print("Warning: st.context.ip_address is unavailable (Streamlit < 1.45), clients are not told apart by address")
+        return None
+    return resolve_client_address(st.context.ip_address, st.context.headers.get("X-Forwarded-For"))
+
+def login_throttle_key() -> str:
+    """Failed logins are counted per client address if it can be trusted, otherwise per browser session."""
+    return client_address() or f"session:{st.session_state.session_id}"
+
+def start_session(auth_manager: AuthManager):
+    """Mark the session as logged in and keep its signed token in the URL for reloads."""
+    token = auth_manager.issue_session_token()
+    st.session_state.authenticated = True
+    st.session_state.session_token = token
+    st.session_state.session_start_time = time.time()
+    st.query_params["session"] = token
+    # Do not leave the password in the address bar
+    if "token" in st.query_params:
+        del st.query_params["token"]
+
+def end_session():
+    """Forget the session's login, including the token in the URL."""
+    st.session_state.authenticated = False
+    st.session_state.session_token = None
+    st.session_state.session_start_time = None
+    if "session" in st.query_params:
+        del st.query_params["session"]
 
 def check_url_authentication():
     """Check if user is authenticated via URL parameter."""
     auth_manager = AuthManager()
     query_params = st.query_params
     
+    # A signed session token from an earlier login: no password check needed
+    issued = auth_manager.validate_session_token(query_params.get("session"))
+    if issued is not None:
+        st.session_state.authenticated = True
+        st.session_state.session_token = query_params["session"]
+        st.session_state.session_start_time = issued
+        return True
+    
     if "token" in query_params:
         password = query_params["token"]
-        if auth_manager.verify_password(password):
-            st.session_state.authenticated = True
-            st.session_state.session_token = auth_manager.generate_session_token(password)
-            st.session_state.session_start_time = time.time()
+        try:
+            valid = auth_manager.verify_password(password, login_throttle_key())
+        except AuthThrottled as e:
+            st.warning(f"⏳ {e}.")
+            return False
+        if valid:
+            start_session(auth_manager)
             return True
     return False
 
@@ -462,19 +142,22 @@ def show_authentication_form():
     """Display the authentication form."""
     st.markdown('<div class="auth-container">', unsafe_allow_html=True)
     
-    st.markdown(f"# {APP_ICON} {APP_TITLE}")
+    st.markdown(page_heading())
     st.markdown("### Welcome! Please enter the access password to continue.")
     
     password = st.text_input("Access Password", type="password", key="auth_password")
     
     if st.button("Access Chatbot", key="auth_button"):
         auth_manager = AuthManager()
-        if auth_manager.verify_password(password):
-            st.session_state.authenticated = True
-            st.session_state.session_token = auth_manager.generate_session_token(password)
-            st.session_state.session_start_time = time.time()
+        try:
+            valid = auth_manager.verify_password(password, login_throttle_key())
+        except AuthThrottled as e:
+            st.error(f"⏳ {e}.")
+            valid = None
+        if valid:
+            start_session(auth_manager)
             st.rerun()
-        else:
+        elif valid is not None:
             st.error("❌ Invalid password. Please try again.")
     
     st.markdown("</div>", unsafe_allow_html=True)
@@ -488,23 +171,40 @@ def check_session_validity():
     """Check if the current session is still valid."""
     if st.session_state.authenticated and st.session_state.session_start_time:
         auth_manager = AuthManager()
-        if not auth_manager.is_session_valid(
-            st.session_state.session_token, 
-            st.session_state.session_start_time
-        ):
-            st.session_state.authenticated = False
-            st.session_state.session_token = None
-            st.session_state.session_start_time = None
+        if not auth_manager.is_session_valid(st.session_state.session_token):
+            end_session()
             st.warning("Your session has expired. Please log in again.")
             st.rerun()
 
 def display_chat_interface():
     """Display the main chat interface."""
     # Header
-    st.markdown(f"# {APP_ICON} {APP_TITLE}")
+    st.markdown(page_heading())
     
-    # Session info in sidebar
+    # Session info in sidebar; drawn by the chat fragment, so it is
+    # updated after every turn without rerunning the app
     with st.sidebar:
+        session_info = st.empty()
+        
+        if st.button("🚪 Logout"):
+            end_session()
+            st.session_state.messages = []
+            st.session_state.summary_state = SummaryState()
+            st.rerun()
+    
+    # Past messages are drawn on full reruns only. New turns are written into
+    # this container by the chat fragment, so a question does not rerun the
+    # whole app or redraw the conversation.
+    history = st.container()
+    for message in st.session_state.messages:
+        render_message(message["role"], message["content"], history, offline=message.get("offline", False))
+    st.session_state.rendered_upto = len(st.session_state.messages)
+    
+    chat_fragment(history, session_info)
+
+def show_session_info(placeholder):
+    """Session time, tokens and cost, replacing what the placeholder showed before."""
+    with placeholder.container():
         st.markdown("### Session Info")
         if st.session_state.session_start_time:
             session_duration = int(time.time() - st.session_state.session_start_time)
@@ -514,85 +214,196 @@ def display_chat_interface():
         
         estimated_cost = st.session_state.chatbot.get_conversation_cost(st.session_state.total_tokens_used)
         st.markdown(f"**Estimated Cost:** ${estimated_cost:.6f}")
-        
-        if st.button("🚪 Logout"):
-            st.session_state.authenticated = False
-            st.session_state.session_token = None
-            st.session_state.session_start_time = None
-            st.session_state.messages = []
-            st.rerun()
+
+@st.fragment
+def chat_fragment(history, session_info):
+    """Chat input, suggestions, the new turn and session info; reruns on its own when a question is asked."""
+    # Fragment reruns skip main(), so the session is checked here as well
+    check_session_validity()
+    question = st.session_state.pop("pending_question", None)
+    show_session_info(session_info)
+    
+    # What a fragment wrote outside its body is cleared on its next rerun, so
+    # turns added since the last full run are drawn again (from cached HTML)
+    rendered_upto = st.session_state.get("rendered_upto", 0)
+    for message in st.session_state.messages[rendered_upto:]:
+        render_message(message["role"], message["content"], history, offline=message.get("offline", False))
     
     # Display welcome message if no messages yet
-    if not st.session_state.messages:
-        welcome_msg = get_welcome_message()
-        st.markdown(f'<div class="welcome-message">{welcome_msg}</div>', unsafe_allow_html=True)
-        
-        # Show suggested questions
-        st.markdown("### 💡 Suggested Questions:")
-        suggested = get_suggested_questions()
-        
-        cols = st.columns(2)
-        for i, question in enumerate(suggested):
-            col = cols[i % 2]
-            if col.button(question, key=f"suggestion_{i}"):
-                st.session_state.messages.append({"role": "user", "content": question})
-                handle_user_message(question)
-                st.rerun()
-        
-        # Add disclaimer
-        st.markdown("""
-        <div style="margin-top: 20px; padding: 15px; background-color: #f8f9fa; border-left: 4px solid #2563eb; border-radius: 5px;">
-            <p style="margin: 0; font-style: italic; color: #6b7280; font-size: 14px;">
-                This chatbot can answer questions based on my CV and references. It does its best to be helpful, but it might occasionally make mistakes or provide incomplete information. Please double-check anything important.
-            </p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    # Display chat messages
-    for message in st.session_state.messages:
-        if message["role"] == "user":
-            st.markdown(f"""
-            <div class="chat-message user-message">
-                <strong>You:</strong> {message["content"]}
-            </div>
-            """, unsafe_allow_html=True)
-        else:
-            st.markdown(f"""
-            <div class="chat-message assistant-message">
-                <strong>Assistant:</strong> {message["content"]}
-            </div>
-            """, unsafe_allow_html=True)
+    if not st.session_state.messages and question is None:
+        show_welcome()
     
     # Chat input
-    if user_input := st.chat_input("Ask me anything about my professional background..."):
-        st.session_state.messages.append({"role": "user", "content": user_input})
-        handle_user_message(user_input)
-        st.rerun()
+    user_input = st.chat_input("Ask me anything about my professional background...")
+    question = question or user_input
+    if question:
+        st.session_state.messages.append({"role": "user", "content": question})
+        handle_user_message(question, history)
+        # A full rerun now and then keeps that redraw short
+        if len(st.session_state.messages) - rendered_upto > MAX_FRAGMENT_MESSAGES:
+            st.rerun()
+        show_session_info(session_info)
 
-def handle_user_message(user_input: str):
-    """Handle user message and get chatbot response."""
-    with st.spinner("Thinking..."):
-        response_data = st.session_state.chatbot.get_response(
-            user_input, 
-            st.session_state.messages[:-1]  # Exclude the current user message
-        )
+def ask_suggested_question(question: str):
+    """Button callback: the question is handled by the chat fragment rerun that follows."""
+    st.session_state.pending_question = question
+
+def show_welcome():
+    """Welcome text, suggested questions and disclaimer shown before the first question."""
+    welcome_msg = get_welcome_message()
+    st.markdown(f'<div class="welcome-message">{welcome_msg}</div>', unsafe_allow_html=True)
+    
+    # Show suggested questions
+    st.markdown("### 💡 Suggested Questions:")
+    profile = st.session_state.profile
+    suggested = profile.suggested_questions if profile is not None else get_suggested_questions()
+    
+    cols = st.columns(2)
+    for i, question in enumerate(suggested):
+        col = cols[i % 2]
+        col.button(question, key=f"suggestion_{i}", on_click=ask_suggested_question, args=(question,))
+    
+    # Add disclaimer
+    st.markdown("""
+    <div style="margin-top: 20px; padding: 15px; background-color: #f8f9fa; border-left: 4px solid #2563eb; border-radius: 5px;">
+        <p style="margin: 0; font-style: italic; color: #6b7280; font-size: 14px;">
+            This chatbot can answer questions based on my CV and references. It does its best to be helpful, but it might occasionally make mistakes or provide incomplete information. Please double-check anything important.
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+
+@lru_cache(maxsize=4096)
+def message_html(role: str, content: str, offline: bool = False) -> str:
+    """HTML of a chat message bubble; memoized, as every rerun draws the same past messages again."""
+    if offline:
+        content += "<br><em>Offline answer: the live assistant is temporarily unavailable.</em>"
+    if role == "user":
+        return f"""
+        <div class="chat-message user-message">
+            <strong>You:</strong> {content}
+        </div>
+        """
+    return f"""
+        <div class="chat-message assistant-message">
+            <strong>Assistant:</strong> {content}
+        </div>
+        """
+
+def render_message(role: str, content: str, container=None, offline: bool = False, partial: bool = False):
+    """Render a single chat message bubble; partial (streaming) content bypasses the HTML cache."""
+    target = container if container is not None else st
+    html = message_html.__wrapped__(role, content, offline) if partial else message_html(role, content, offline)
+    target.markdown(html, unsafe_allow_html=True)
+
+def rate_limit_identities() -> list:
+    """
+    Rate limit buckets this session draws from: the session, its login
+    token and the client address. Sessions and tokens are cheap to renew,
+    the address is not; it is only used when it can be trusted, as behind
+    a proxy every visitor would share one bucket.
+    """
+    identities = [f"session:{st.session_state.session_id}"]
+    if st.session_state.session_token:
+        identities.append(f"token:{st.session_state.session_token}")
+    address = client_address()
+    if address:
+        identities.append(f"client:{address}")
+    return identities
+
+def rate_limit_message(decision: RateLimitDecision) -> str:
+    """User-facing explanation of a refused question."""
+    wait = int(decision.retry_after)
+    wait_text = f"{wait // 3600}h {wait % 3600 // 60}m" if wait >= 3600 else f"{max(1, wait // 60)} min"
+    if decision.reason == "requests":
+        return f"⏳ You have reached the limit of {MAX_REQUESTS_PER_HOUR} questions per hour. Please try again in {wait_text}."
+    if decision.reason == "tokens":
+        return f"⏳ You have used your daily allowance of {MAX_TOKENS_PER_DAY} tokens. Please try again in {wait_text}."
+    return f"⏳ The chatbot has reached its daily usage budget. Please try again in {wait_text}."
+
+def handle_user_message(user_input: str, container):
+    """Handle user message and stream the chatbot response into the chat container."""
+    refresh_chatbot()
+    if st.session_state.chatbot is None:
+        # The profile was removed while the session was open
+        st.session_state.messages.pop()
+        st.error("Unknown or missing profile. Please use the link you were given.")
+        return
+    
+    identities = rate_limit_identities()
+    if RATE_LIMIT_ENABLED:
+        decision = get_rate_limiter().check(identities)
+        if not decision.allowed:
+            # The question is not answered, so it is not kept in the chat either
+            st.session_state.messages.pop()
+            st.warning(rate_limit_message(decision))
+            return
+    
+    # The new question has not been rendered yet on this run
+    render_message("user", user_input, container)
+    placeholder = container.empty()
+    
+    # Placeholder bubble until the first token arrives
+    render_message("assistant", "<em>Thinking...</em>", placeholder, partial=True)
+    
+    # Older turns are represented by the rolling summary instead
+    summary_state = st.session_state.summary_state
+    summary, covered = summary_state.snapshot()
+    
+    response_data = None
+    partial_response = ""
+    turn_tokens = 0
+    charged_tokens = 0
+    # Runs on the shared async engine, which caps upstream concurrency
+    async_chatbot = get_async_chatbot(st.session_state.chatbot)
+    for event in async_chatbot.stream_response_sync(
+        user_input, 
+        st.session_state.messages[covered:-1],  # Exclude the current user message
+        summary=summary
+    ):
+        if event["type"] == "text":
+            partial_response += event["text"]
+            render_message("assistant", partial_response + " ▌", placeholder, partial=True)
+        else:
+            response_data = event
+    
+    if response_data and response_data["success"]:
+        assistant_response = response_data["response"]
+        offline = response_data.get("offline", False)
+        render_message("assistant", assistant_response, placeholder, offline=offline)
+        st.session_state.messages.append({"role": "assistant", "content": assistant_response, "offline": offline})
         
-        if response_data["success"]:
-            assistant_response = response_data["response"]
-            st.session_state.messages.append({"role": "assistant", "content": assistant_response})
-            
-            # Update token usage
-            if "tokens_used" in response_data:
-                st.session_state.total_tokens_used += response_data["tokens_used"]["total"]
+        # Update token usage from the final usage record of the stream
+        if "tokens_used" in response_data:
+            turn_tokens += response_data["tokens_used"]["total"]
+            charged_tokens += billed_tokens(response_data["tokens_used"])
+        
+        # Compact older turns in the background for the next request
+        get_summarizer().maybe_schedule(summary_state, st.session_state.messages)
+    else:
+        response_data = response_data or {}
+        if response_data.get("offline"):
+            # Circuit open and no local answer for this question
+            error_message = response_data["response"]
         else:
             error_message = "I apologize, but I encountered an error. Please try again."
-            st.session_state.messages.append({"role": "assistant", "content": error_message})
-            st.error(f"Error: {response_data.get('error', 'Unknown error')}")
+        render_message("assistant", error_message, placeholder)
+        st.session_state.messages.append({"role": "assistant", "content": error_message})
+        st.error(f"Error: {response_data.get('error', 'Unknown error')}")
+    
+    summary_tokens = summary_state.take_tokens()
+    st.session_state.total_tokens_used += turn_tokens + summary_tokens
+    if RATE_LIMIT_ENABLED:
+        get_rate_limiter().charge_tokens(identities, charged_tokens + summary_tokens)
 
 def main():
     """Main application function."""
     initialize_session_state()
     
+    if st.session_state.chatbot is None:
+        # Multi-tenant mode without a known ?profile=
+        st.error("Unknown or missing profile. Please use the link you were given.")
+        return
+    
     # Check URL authentication first
     if not st.session_state.authenticated:
         check_url_authentication()
@@ -0,0 +1,76 @@
+import os
+import re
+import hashlib
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+# Quoted strings are kept verbatim: attribute selectors such as
+# [style*="rgb(0, 0, 0)"] must match the browser's own spacing
+_STRING = re.compile(r'("(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\')')
+_STRING_OR_COMMENT = re.compile(_STRING.pattern + r"|/\*.*?\*/", re.S)
+_SPACE = re.compile(r"\s+")
+_AROUND_PUNCTUATION = re.compile(r"\s*([{};,>])\s*")
+_AFTER_COLON = re.compile(r":\s+")
+
+def minify_css(css: str) -> str:
+    """Drop comments and redundant whitespace from a stylesheet."""
+    # Comments go first, in the same pass as strings, as either may contain the other's quotes
+    css = _STRING_OR_COMMENT.sub(lambda match: match.group(1) or "", css)
+    parts = _STRING.split(css)
+    for i in range(0, len(parts), 2):
+        code = _SPACE.sub(" ", parts[i])
+        code = _AROUND_PUNCTUATION.sub(r"\1", code)
+        parts[i] = _AFTER_COLON.sub(":", code).replace(";}", "}")
+    return "".join(parts).strip()
+
+@lru_cache(maxsize=None)
+def minified_stylesheet(source: Path) -> str:
+    """Read and minify a stylesheet, once per process."""
+    with open(source, 'r', encoding='utf-8') as f:
+        return minify_css(f.read())
+
+@lru_cache(maxsize=None)
+def build_stylesheet(source: Path, static_dir: Path) -> str:
+    """
+    Write the minified source stylesheet to static_dir under a content hash.
+    
+    The name changes whenever the styles do, so browsers may cache a
+    stylesheet for as long as they like. Built once per process; older
+    builds of the same stylesheet are removed.
+    
+    Returns:
+        File name of the built stylesheet, relative to static_dir
+    
+    Raises:
+        OSError: If the source cannot be read or static_dir not written
+    """
+    source = Path(source)
+    static_dir = Path(static_dir)
+    minified = minified_stylesheet(source).encode("utf-8")
+    digest = hashlib.sha256(minified).hexdigest()[:12]
+    name = f"{source.stem}.{digest}.min.css"
+    
+    target = static_dir / name
+    if not target.exists():
+        static_dir.mkdir(parents=True, exist_ok=True)
+        # Other processes may build the same file at once; replace atomically
+        fd, tmp_path = tempfile.mkstemp(dir=static_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(minified)
+            os.replace(tmp_path, target)
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+    
+    for stale in static_dir.glob(f"{source.stem}.*.min.css"):
+        if stale.name != name:
+            try:
+                stale.unlink()
+            except OSError:
+                pass
+    return name
@@ -0,0 +1,500 @@
+import asyncio
+import threading
+import concurrent.futures
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional, Iterator, AsyncIterator, Callable, Tuple
+import anthropic
+from backend.cache import TurnKey
+from backend.retry import RetryPolicy, RetryExhausted, RETRYABLE, classify_error, attempt_record
+from backend.circuit_breaker import CircuitBreaker, Admission
+from backend.singleflight import SingleFlight, Flight
+from config.settings import get_config, MAX_CONCURRENT_REQUESTS, REQUEST_TIMEOUT
+
+ERROR_RESPONSE = "I apologize, but I encountered an error processing your request. Please try again."
+OFFLINE_RESPONSE = "The assistant is temporarily unavailable. Please try again in a minute."
+
+class AsyncEngine:
+    """
+    Process-wide event loop running every upstream model call.
+    
+    All sessions submit their calls here, and a single semaphore caps how
+    many requests are in flight at once; the rest wait in line instead of
+    piling onto the API.
+    """
+    
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_REQUESTS):
+        self.max_concurrent = max_concurrent
+        self.in_flight = 0
+        self.waiting = 0
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="cv-async-engine", daemon=True)
+        self._thread.start()
+        self._semaphore = self.run(self._create_semaphore())
+        # Retries are done by AsyncCVChatbot's RetryPolicy, not the SDK
+        self.client = anthropic.AsyncAnthropic(api_key=get_config().anthropic_api_key, max_retries=0)
+    
+    async def _create_semaphore(self) -> asyncio.Semaphore:
+        # Created on the engine loop so it is bound to it on every Python version
+        return asyncio.Semaphore(self.max_concurrent)
+    
+    @asynccontextmanager
+    async def slot(self, timeout: Optional[float] = None):
+        """Hold one of the max_concurrent upstream request slots, waiting at most timeout seconds."""
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout)
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+    
+    def submit(self, coro) -> concurrent.futures.Future:
+        """Schedule a coroutine on the engine loop from any thread."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+    
+    def run(self, coro, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the engine loop and wait for its result, cancelling it on timeout."""
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+    
+    def stats(self) -> Dict[str, int]:
+        """Current limiter state."""
+        return {"max_concurrent": self.max_concurrent, "in_flight": self.in_flight, "waiting": self.waiting}
+
+class AsyncCVChatbot:
+    """
+    Answers the turns of a CVChatbot, making its model calls on the shared AsyncEngine.
+    
+    The wrapped CVChatbot builds prompts and answers from its caches;
+    retries, the circuit breaker, escalation from the fast model and the
+    coalescing of identical requests live here. This is the only path to
+    the model: CVChatbot.get_response() and stream_response() block on it.
+    """
+    
+    def __init__(self, chatbot, engine: AsyncEngine, timeout: float = REQUEST_TIMEOUT):
+        self.chatbot = chatbot
+        self.engine = engine
+        self.timeout = timeout  # Total deadline per user turn, queueing and retries included
+        self.retry_policy = RetryPolicy()
+        # Fail fast during upstream outages and answer from the chatbot's FAQ entries
+        self.breaker = CircuitBreaker()
+        # Identical questions in flight at the same time share one upstream call
+        self.flights = SingleFlight()
+    
+    def get_response_sync(self, user_message: str, conversation_history: List[Dict[str, str]] = None,
+                          summary: str = "") -> Dict[str, Any]:
+        """
+        Get a response, blocking the calling thread until it is complete.
+        
+        Concurrent identical requests share one upstream call.
+        
+        Args:
+            user_message: The user's question
+            conversation_history: Previous messages in the conversation
+            summary: Running summary of older turns not included in the history
+        
+        Returns:
+            Dictionary containing response and metadata
+        """
+        result = None
+        for event in self._shared_events(user_message, conversation_history, summary, streaming=False):
+            result = event
+        result = dict(result)
+        del result["type"]
+        result.pop("partial_response", None)
+        return result
+    
+    def stream_response_sync(self, user_message: str, conversation_history: List[Dict[str, str]] = None,
+                             summary: str = "", on_usage: Optional[Callable[[Dict[str, int]], Any]] = None
+                             ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a response as it is generated, blocking the calling thread between events.
+        
+        Yields {"type": "text", "text": ...} for every text delta, followed
+        by a single final event with the same keys as get_response_sync()
+        plus "type": "done" (or "type": "error" on failure).
+        
+        Concurrent identical requests share one upstream stream; callers
+        joining late get the text produced so far replayed first. Closing
+        the iterator early cancels the upstream request once no other caller
+        is waiting for it.
+        
+        If this call starts the upstream request, on_usage(tokens_used) is
+        called in a worker thread once it completes, even if this caller has
+        left in the meantime while others kept the request alive. Callers
+        joining a request already in flight are charged nothing. A request
+        cancelled because nobody waits for it any more reports no usage.
+        """
+        text_seen = False
+        for event in self._shared_events(user_message, conversation_history, summary, True, on_usage):
+            if event["type"] == "text":
+                text_seen = True
+            elif event["success"] and not text_seen:
+                # Joined a non-streaming flight: deliver its answer as one chunk
+                yield {"type": "text", "text": event["response"]}
+            yield event
+    
+    async def stream_shared(self, user_message: str, conversation_history: List[Dict[str, str]] = None,
+                            summary: str = "", streaming: bool = True,
+                            on_usage: Optional[Callable[[Dict[str, int]], Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Async version of stream_response_sync(). Must run on the engine loop.
+        
+        With streaming=False a request that starts the flight makes a
+        non-streaming call, for callers that only want the final event.
+        """
+        turn, flight, leader = await self._off_loop(
+            self._join, user_message, conversation_history, summary, streaming, on_usage
+        )
+        if flight is None:
+            yield {"type": "text", "text": turn["response"]}
+            yield dict(turn, type="done")
+            return
+        text_seen = False
+        try:
+            async for event in flight.aiter_events():
+                if event["type"] == "text":
+                    text_seen = True
+                elif streaming and event["success"] and not text_seen:
+                    # Joined a non-streaming flight: deliver its answer as one chunk
+                    yield {"type": "text", "text": event["response"]}
+                yield event if leader else self._as_follower(event)
+        finally:
+            self.flights.leave(turn.answer, flight)
+    
+    def _shared_events(self, user_message: str, conversation_history: Optional[List[Dict[str, str]]],
+                       summary: str, streaming: bool,
+                       on_usage: Optional[Callable[[Dict[str, int]], Any]] = None) -> Iterator[Dict[str, Any]]:
+        """Run or join the single flight for this turn and yield its events."""
+        turn, flight, leader = self._join(user_message, conversation_history, summary, streaming, on_usage)
+        if flight is None:
+            yield {"type": "text", "text": turn["response"]}
+            yield dict(turn, type="done")
+            return
+        try:
+            for event in flight.iter_events():
+                yield event if leader else self._as_follower(event)
+        finally:
+            self.flights.leave(turn.answer, flight)
+    
+    def _join(self, user_message: str, conversation_history: Optional[List[Dict[str, str]]], summary: str,
+              streaming: bool, on_usage: Optional[Callable[[Dict[str, int]], Any]] = None
+              ) -> Tuple[Any, Optional[Flight], bool]:
+        """
+        Prepare a turn and join (or start) its flight; on_usage is kept only if it starts it.
+        
+        Returns:
+            (turn_key, flight, leader), or (local_result, None, False) when
+            the turn was answered locally without a model call
+        """
+        cache_key, request = self.chatbot.prepare_turn(user_message, conversation_history, summary)
+        cached = self.chatbot.local_answer(user_message, cache_key, request)
+        if cached is not None:
+            return cached, None, False
+        
+        async def one_event():
+            result = await self._respond(user_message, cache_key, request)
+            yield dict(result, type="done" if result["success"] else "error")
+        
+        def start(flight: Flight):
+            events = self._stream_prepared(user_message, cache_key, request) if streaming else one_event()
+            return self.engine.submit(self._produce(cache_key.answer, flight, events, on_usage))
+        
+        flight, leader = self.flights.join(cache_key.answer, start)
+        return cache_key, flight, leader
+    
+    async def _stream_prepared(self, user_message: str, cache_key: TurnKey,
+                               request: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a turn that missed the local fast paths."""
+        if self._is_fast_route(request):
+            # Fast answers are checked before they are shown, so they are
+            # not streamed; they are short and quick anyway
+            result = await self._respond(user_message, cache_key, request)
+            if result["success"]:
+                yield {"type": "text", "text": result["response"]}
+                yield dict(result, type="done")
+            else:
+                yield dict(result, type="error", partial_response="")
+            return
+        admission = self.breaker.allow_request()
+        if not admission.allowed:
+            for event in self._offline_events(user_message):
+                yield event
+            return
+        events = self._stream_upstream(user_message, cache_key, request, admission)
+        try:
+            async for event in events:
+                yield event
+        finally:
+            # Close the upstream stream now rather than when the generator is collected
+            await events.aclose()
+            self.breaker.release(admission)
+    
+    async def _stream_upstream(self, user_message: str, cache_key: TurnKey, request: Dict[str, Any],
+                               admission: Admission) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a turn from the model, with retries and book-keeping."""
+        loop = self.engine.loop
+        turn_started = loop.time()
+        deadline = turn_started + self.timeout
+        attempts = []
+        chunks = []
+        while True:
+            started = loop.time()
+            try:
+                async with self.engine.slot(deadline - started):
+                    remaining = max(0.0, deadline - loop.time())
+                    async with self.engine.client.messages.stream(**request, timeout=remaining) as stream:
+                        text_stream = stream.text_stream.__aiter__()
+                        while True:
+                            remaining = deadline - loop.time()
+                            if remaining <= 0:
+                                raise asyncio.TimeoutError()
+                            try:
+                                text = await asyncio.wait_for(text_stream.__anext__(), remaining)
+                            except StopAsyncIteration:
+                                break
+                            chunks.append(text)
+                            yield {"type": "text", "text": text}
+                        
+                        # Usage is only exact once the final message has arrived
+                        final_message = await stream.get_final_message()
+                attempts.append(attempt_record(len(attempts) + 1, started, loop.time()))
+                break
+            
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                finished = loop.time()
+                # Once text has been shown, a retry would repeat it
+                delay = None if chunks else self.retry_policy.next_delay(len(attempts) + 1, e, deadline - finished)
+                attempts.append(attempt_record(len(attempts) + 1, started, finished, e, delay))
+                if delay is None:
+                    if chunks:
+                        self._record_failure(e, finished - turn_started, admission)
+                        yield dict(self._error_result(e, attempts), type="error", partial_response="".join(chunks))
+                    else:
+                        for event in self._failure_events(user_message, e, finished - turn_started, admission, attempts):
+                            yield event
+                    return
+                await asyncio.sleep(delay)
+        
+        result = {
+            "success": True,
+            "response": "".join(chunks),
+            "tokens_used": tokens_used(final_message.usage),
+            "cached": False,
+            "attempts": attempts,
+            "model": request["model"],
+            "escalated": False
+        }
+        duration = loop.time() - turn_started
+        await self._off_loop(self._record_success, cache_key, request, result, duration, admission)
+        yield dict(result, type="done")
+    
+    async def _respond(self, user_message: str, cache_key: TurnKey, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer a turn that missed the cache: breaker, model call(s), book-keeping."""
+        admission = self.breaker.allow_request()
+        if not admission.allowed:
+            return self._offline_result(user_message)
+        
+        loop = self.engine.loop
+        started = loop.time()
+        try:
+            # One deadline covers queueing, all attempts and a possible escalation
+            result = await self._complete(request, started + self.timeout)
+            await self._off_loop(self._record_success, cache_key, request, result, loop.time() - started, admission)
+            return result
+        
+        except RetryExhausted as e:
+            return self._failure_result(user_message, e.last_error, loop.time() - started, admission, e.attempts)
+        except Exception as e:
+            return self._failure_result(user_message, e, loop.time() - started, admission)
+        finally:
+            self.breaker.release(admission)
+    
+    async def _complete(self, request: Dict[str, Any], deadline: float) -> Dict[str, Any]:
+        """
+        Make the model call(s) for a request, retrying transient errors until the deadline.
+        
+        A fast-model answer that fails the router's check is escalated to
+        the strong model; if that call fails, the fast answer is kept.
+        """
+        def create(req):
+            async def call(remaining: float):
+                async with self.engine.slot():
+                    return await self.engine.client.messages.create(**req)
+            return call
+        
+        response, attempts = await self.retry_policy.call_async(create(request), deadline)
+        result = self._completion_result(request, response, attempts)
+        if not self._is_fast_route(request) or not self.chatbot.router.needs_escalation(response):
+            return result
+        
+        strong_request = self._escalated_request(request)
+        try:
+            response, more_attempts = await self.retry_policy.call_async(create(strong_request), deadline)
+        except RetryExhausted as e:
+            result["attempts"] += e.attempts
+            return result
+        return self._merge_escalation(result, strong_request, response, more_attempts)
+    
+    def _is_fast_route(self, request: Dict[str, Any]) -> bool:
+        router = self.chatbot.router
+        return router is not None and request["model"] == router.fast_model
+    
+    def _escalated_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """The same request, sent to the strong model."""
+        return dict(request, model=self.chatbot.router.strong_model, max_tokens=self.chatbot.max_tokens)
+    
+    def _completion_result(self, request: Dict[str, Any], response: Any, attempts: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build the success response for a single model call."""
+        return {
+            "success": True,
+            "response": response.content[0].text,
+            "tokens_used": tokens_used(response.usage),
+            "cached": False,
+            "attempts": attempts,
+            "model": request["model"],
+            "escalated": False
+        }
+    
+    def _merge_escalation(self, result: Dict[str, Any], strong_request: Dict[str, Any], response: Any,
+                          attempts: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Replace a fast answer by the strong model's, counting the tokens of both calls."""
+        strong = self._completion_result(strong_request, response, result["attempts"] + attempts)
+        strong["tokens_used"] = {
+            key: result["tokens_used"][key] + strong["tokens_used"][key]
+            for key in strong["tokens_used"]
+        }
+        strong["escalated"] = True
+        return strong
+    
+    def _record_success(self, cache_key: TurnKey, request: Dict[str, Any], result: Dict[str, Any], duration: float,
+                        admission: Admission):
+        """Book-keeping after a successful upstream call: breaker and caches."""
+        self.breaker.record_success(duration, admission)
+        self.chatbot.remember_answer(cache_key, request, result["response"])
+    
+    def _record_failure(self, error: BaseException, duration: float, admission: Admission):
+        """Count an upstream failure towards the breaker; client errors do not count."""
+        if classify_error(error) != "client":
+            self.breaker.record_failure(duration, admission)
+    
+    def _failure_result(self, user_message: str, error: BaseException, duration: float, admission: Admission,
+                        attempts: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Record a failed turn and answer offline if a local answer exists."""
+        self._record_failure(error, duration, admission)
+        if classify_error(error) in RETRYABLE and self.chatbot.faq.lookup(user_message) is not None:
+            return dict(self._offline_result(user_message), attempts=attempts or [])
+        return self._error_result(error, attempts)
+    
+    def _failure_events(self, user_message: str, error: BaseException, duration: float, admission: Admission,
+                        attempts: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Stream events for a failed turn, see _failure_result()."""
+        result = self._failure_result(user_message, error, duration, admission, attempts)
+        if result["success"]:
+            yield {"type": "text", "text": result["response"]}
+            yield dict(result, type="done")
+        else:
+            yield dict(result, type="error", partial_response="")
+    
+    def _offline_result(self, user_message: str) -> Dict[str, Any]:
+        """Answer from the local FAQ store without calling the model."""
+        answer = self.chatbot.faq.lookup(user_message)
+        no_tokens = {"input": 0, "output": 0, "cache_read": 0, "cache_write": 0, "total": 0}
+        if answer is None:
+            return {
+                "success": False,
+                "offline": True,
+                "error": "Service temporarily unavailable",
+                "error_category": "circuit_open",
+                "response": OFFLINE_RESPONSE
+            }
+        return {"success": True, "offline": True, "cached": False, "response": answer, "tokens_used": no_tokens}
+    
+    def _offline_events(self, user_message: str) -> Iterator[Dict[str, Any]]:
+        """Stream events for an offline answer."""
+        result = self._offline_result(user_message)
+        if result["success"]:
+            yield {"type": "text", "text": result["response"]}
+            yield dict(result, type="done")
+        else:
+            yield dict(result, type="error", partial_response="")
+    
+    @staticmethod
+    def _error_result(error: BaseException, attempts: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Build the failure response, including how the attempts went."""
+        return {
+            "success": False,
+            "error": str(error),
+            "error_category": classify_error(error),
+            "attempts": attempts or [],
+            "response": ERROR_RESPONSE
+        }
+    
+    @staticmethod
+    async def _off_loop(func, *args) -> Any:
+        """
+        Run a blocking call in a worker thread.
+        
+        Answer cache reads and writes may wait for SQLite locks held by
+        other processes; on the engine loop that would stall every turn in
+        flight.
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+    
+    @staticmethod
+    def _as_follower(event: Dict[str, Any]) -> Dict[str, Any]:
+        """The upstream call was paid for by the leader."""
+        if event["type"] == "text":
+            return event
+        return dict(
+            event,
+            coalesced=True,
+            tokens_used={"input": 0, "output": 0, "cache_read": 0, "cache_write": 0, "total": 0}
+        )
+    
+    async def _produce(self, key: str, flight: Flight, events: AsyncIterator[Dict[str, Any]],
+                       on_usage: Optional[Callable[[Dict[str, int]], Any]] = None):
+        """
+        Drive the upstream event stream of a flight on the engine loop.
+        
+        The usage of the final event is reported to the caller that started
+        the flight, whether or not it is still listening.
+        """
+        try:
+            async for event in events:
+                flight.publish(event)
+                if on_usage is not None and event["type"] != "text" and "tokens_used" in event:
+                    try:
+                        await self._off_loop(on_usage, event["tokens_used"])
+                    except Exception as e:
+                        print(f"Error recording token usage: {e}")
+        except asyncio.CancelledError:
+            flight.publish(dict(self._error_result(RuntimeError("Request cancelled")), type="error",
+                                partial_response=""))
+            raise
+        except Exception as e:
+            flight.publish(dict(self._error_result(e), type="error", partial_response=""))
+        finally:
+            self.flights.finish(key, flight)
+
+def tokens_used(usage: Any) -> Dict[str, int]:
+    """Build the tokens_used dict of a response, reporting cache reads and writes separately."""
+    cache_read = getattr(usage, "cache_read_input_tokens", None) or 0
+    cache_write = getattr(usage, "cache_creation_input_tokens", None) or 0
+    return {
+        "input": usage.input_tokens,
+        "output": usage.output_tokens,
+        "cache_read": cache_read,
+        "cache_write": cache_write,
+        "total": usage.input_tokens + cache_read + cache_write + usage.output_tokens
+    }
@@ -1,48 +1,229 @@
-import os
-import hashlib
+import hmac
+import base64
 import time
+import ipaddress
+import hashlib
+import secrets
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 import bcrypt
-import streamlit as st
-from typing import Optional
+from typing import Dict, Deque, Optional
+from config.settings import (
+    get_config, SESSION_TIMEOUT, AUTH_MAX_WORKERS, AUTH_MAX_PENDING, AUTH_CACHE_TTL, AUTH_MAX_FAILURES, AUTH_FAILURE_WINDOW,
+    TRUSTED_PROXY_HOPS
+)
+
+class AuthThrottled(Exception):
+    """Raised when a password check is refused without running it."""
+    
+    def __init__(self, retry_after: float):
+        super().__init__(f"Too many login attempts, try again in {retry_after:.0f} seconds")
+        self.retry_after = retry_after
+
+_untrusted_warned = False
+
+def resolve_client_address(peer: Optional[str], forwarded_for: Optional[str],
+                           trusted_hops: int = TRUSTED_PROXY_HOPS) -> Optional[str]:
+    """
+    Client address for login throttling and rate limits, or None if it cannot be trusted.
+    
+    Only the X-Forwarded-For entries appended by our own trusted proxies
+    are believed; anything further left was sent by the client. Without
+    trusted proxies the peer is used only if it is a public address and
+    no proxy added a header: behind an undeclared proxy (or with none
+    reported at all) every visitor would share the proxy's address, and
+    throttling it would lock everyone out at once.
+    """
+    if trusted_hops <= 0:
+        address = peer if not forwarded_for and _is_public(peer) else None
+    else:
+        hops = [hop.strip() for hop in (forwarded_for or "").split(",") if hop.strip()]
+        address = hops[-trusted_hops] if len(hops) >= trusted_hops else None
+    
+    global _untrusted_warned
+    if address is None and not _untrusted_warned:
+        _untrusted_warned = True
+        print("Warning: the client address cannot be trusted (behind a proxy? see TRUSTED_PROXY_HOPS), "
+              "so logins and rate limits are not throttled per address")
+    return address
+
+def _is_public(address: Optional[str]) -> bool:
+    try:
+        return ipaddress.ip_address(address or "").is_global
+    except ValueError:
+        return False
+
+class PasswordVerifier:
+    """
+    Process-wide bcrypt checker shared by every session.
+    
+    bcrypt runs on a small worker pool so a burst of logins cannot occupy
+    every core, and calls beyond max_pending are refused instead of queued.
+    Successful checks are remembered for cache_ttl seconds under an HMAC of
+    the hash and the candidate (with a per-process key), so reopening a
+    shared link skips bcrypt. Clients with max_failures failed attempts in
+    the last failure_window seconds are refused before any hashing.
+    """
+    
+    def __init__(self, max_workers: int = AUTH_MAX_WORKERS, max_pending: int = AUTH_MAX_PENDING,
+                 cache_ttl: float = AUTH_CACHE_TTL, max_failures: int = AUTH_MAX_FAILURES,
+                 failure_window: float = AUTH_FAILURE_WINDOW, max_clients: int = 10000):
+        self.cache_ttl = cache_ttl
+        self.max_failures = max_failures
+        self.failure_window = failure_window
+        self.max_clients = max_clients
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._pending = threading.BoundedSemaphore(max_pending)
+        self._key = secrets.token_bytes(32)
+        self._verified: Dict[str, float] = {}
+        self._failures: "OrderedDict[str, Deque[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def throttle(self, client: Optional[str]):
+        """Raise AuthThrottled if the client failed too often recently."""
+        if client is None:
+            return
+        now = time.time()
+        with self._lock:
+            failures = self._failures.get(client)
+            if not failures:
+                return
+            while failures and now - failures[0] > self.failure_window:
+                failures.popleft()
+            if len(failures) >= self.max_failures:
+                raise AuthThrottled(failures[0] + self.failure_window - now)
+    
+    def record_failure(self, client: Optional[str]):
+        """Count a failed attempt against the client."""
+        if client is None:
+            return
+        with self._lock:
+            failures = self._failures.pop(client, None) or deque(maxlen=self.max_failures)
+            failures.append(time.time())
+            self._failures[client] = failures
+            if len(self._failures) > self.max_clients:
+                self._failures.popitem(last=False)
+    
+    def check_hash(self, candidate: str, stored_hash: bytes) -> bool:
+        """Check a candidate password against a bcrypt hash, off the calling thread."""
+        digest = hmac.new(self._key, stored_hash + b"\0" + candidate.encode('utf-8'), hashlib.sha256).hexdigest()
+        now = time.time()
+        with self._lock:
+            if self._verified.get(digest, 0) > now:
+                return True
+        
+        if not self._pending.acquire(blocking=False):
+            raise AuthThrottled(1)
+        try:
+            valid = self._pool.submit(bcrypt.checkpw, candidate.encode('utf-8'), stored_hash).result()
+        finally:
+            self._pending.release()
+        
+        if valid:
+            with self._lock:
+                if len(self._verified) >= self.max_clients:
+                    self._verified = {key: expiry for key, expiry in self._verified.items() if expiry > now}
+                self._verified[digest] = now + self.cache_ttl
+        return valid
+
+_verifier_lock = threading.Lock()
+_verifier: Optional[PasswordVerifier] = None
+
+def get_verifier() -> PasswordVerifier:
+    """Return the process-wide password verifier."""
+    global _verifier
+    if _verifier is None:
+        with _verifier_lock:
+            if _verifier is None:
+                _verifier = PasswordVerifier()
+    return _verifier
+
+def _signing_key() -> bytes:
+    """
+    Key for session token signatures.
+    
+    SESSION_SECRET from secrets or the environment; otherwise derived from
+    the configured password (hash), so changing it also ends all sessions.
+    """
+    config = get_config()
+    material = config.session_secret or config.password_hash or config.access_password
+    return hashlib.sha256(b"cv-chatbot-session\0" + material.encode('utf-8')).digest()
 
 class AuthManager:
     def __init__(self):
-        self.session_timeout = 3600  # 1 hour in seconds
+        self.session_timeout = SESSION_TIMEOUT
+    
+    def verify_password(self, password: str, client: Optional[str] = None) -> bool:
+        """
+        Verify if the provided password matches the stored hash.
         
-    def verify_password(self, password: str) -> bool:
-        """Verify if the provided password matches the stored hash."""
-        try:
-            # Try to get password hash from Streamlit secrets first
-            if hasattr(st, 'secrets') and 'PASSWORD_HASH' in st.secrets:
-                stored_hash = st.secrets['PASSWORD_HASH'].encode('utf-8')
-                return bcrypt.checkpw(password.encode('utf-8'), stored_hash)
-        except Exception as e:
-            print(f"Error checking password: {e}")
+        Args:
+            password: Candidate password
+            client: Key for attempt throttling (a trusted client address), if any
         
-        # Fallback to environment variable (for local dev)
-        stored_hash = os.getenv("PASSWORD_HASH", "")
-        if stored_hash:
+        Raises:
+            AuthThrottled: If the client failed too often or verification is saturated
+        """
+        verifier = get_verifier()
+        verifier.throttle(client)
+        valid = self._check(verifier, password)
+        if not valid:
+            verifier.record_failure(client)
+        return valid
+    
+    def _check(self, verifier: PasswordVerifier, password: str) -> bool:
+        # Password hash from Streamlit secrets or the environment, read once per process
+        config = get_config()
+        if config.password_hash:
             try:
-                return bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8'))
-            except Exception:
-                pass
-                
+                return verifier.check_hash(password, config.password_hash.encode('utf-8'))
+            except AuthThrottled:
+                raise
+            except Exception as e:
+                print(f"Error checking password: {e}")
+        
         # Final fallback - plain text comparison (insecure)
-        access_password = os.getenv("ACCESS_PASSWORD", "default_password")
-        return password == access_password
+        return hmac.compare_digest(password.encode('utf-8'), config.access_password.encode('utf-8'))
     
     def generate_session_token(self, password: str) -> Optional[str]:
         """Generate a session token after successful password verification."""
         if self.verify_password(password):
-            timestamp = str(int(time.time()))
-            token_data = f"{password}_{timestamp}"
-            return hashlib.sha256(token_data.encode()).hexdigest()
+            return self.issue_session_token()
         return None
     
-    def is_session_valid(self, token: str, creation_time: float) -> bool:
-        """Check if a session token is still valid."""
-        current_time = time.time()
-        return (current_time - creation_time) < self.session_timeout
+    def issue_session_token(self) -> str:
+        """
+        Issue a signed session token expiring after session_timeout.
+        
+        The token is "<issued>.<expires>.<nonce>.<signature>", URL-safe, and
+        can be validated by any process sharing the signing key.
+        """
+        issued = int(time.time())
+        payload = f"{issued}.{issued + self.session_timeout}.{secrets.token_urlsafe(12)}"
+        return f"{payload}.{self._sign(payload)}"
+    
+    def validate_session_token(self, token: Optional[str]) -> Optional[int]:
+        """Return the issue time of a valid, unexpired session token, or None."""
+        if not token:
+            return None
+        payload, _, signature = token.rpartition(".")
+        if not hmac.compare_digest(signature.encode('utf-8'), self._sign(payload).encode('utf-8')):
+            return None
+        try:
+            issued, expires, _ = payload.split(".", 2)
+            issued, expires = int(issued), int(expires)
+        except ValueError:
+            return None
+        return issued if time.time() < expires else None
+    
+    def is_session_valid(self, token: str, creation_time: Optional[float] = None) -> bool:
+        """Check if a session token is still valid (signature and expiry; no bcrypt)."""
+        return self.validate_session_token(token) is not None
+    
+    def _sign(self, payload: str) -> str:
+        digest = hmac.new(_signing_key(), payload.encode('utf-8'), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).rstrip(b"=").decode('ascii')
     
     def get_password_from_url(self, query_params: dict) -> Optional[str]:
         """Extract password from URL query parameters."""
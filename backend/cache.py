@@ -0,0 +1,126 @@
+import re
+import json
+import time
+import hashlib
+import threading
+from functools import lru_cache
+from collections import OrderedDict, namedtuple
+from typing import List, Dict, Any, Optional, Tuple
+
+_APOSTROPHES = re.compile(r"['’`´]")
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_question(question: str) -> str:
+    """
+    Normalize a question so trivial variants share one cache entry.
+    
+    Lowercases, drops apostrophes (so "Paul's" and "Pauls" match), strips
+    remaining punctuation and collapses whitespace.
+    """
+    text = _APOSTROPHES.sub("", question.lower())
+    text = _PUNCTUATION.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+@lru_cache(maxsize=8)
+def cv_fingerprint(cv_data: str) -> str:
+    """Stable hash identifying a particular version of the CV text (memoized, as sessions share the same text)."""
+    return hashlib.sha256(cv_data.encode("utf-8")).hexdigest()
+
+def make_context_key(history: List[Dict[str, str]], fingerprint: str, model: str, summary: str = "") -> str:
+    """Hash of everything besides the question that shapes an answer: history, summary, CV and model."""
+    payload = {
+        "h": [[msg["role"], msg["content"]] for msg in history or []],
+        "s": summary,
+        "cv": fingerprint,
+        "m": model
+    }
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def make_cache_key(question: str, history: List[Dict[str, str]], fingerprint: str, model: str, summary: str = "") -> str:
+    """Build the answer cache key from the question, history window, summary, CV and model."""
+    context_key = make_context_key(history, fingerprint, model, summary)
+    return hashlib.sha256(f"{normalize_question(question)}\n{context_key}".encode("utf-8")).hexdigest()
+
+# Cache identity of one turn: exact answer key, context key (for semantic
+# matching) and the raw question
+TurnKey = namedtuple("TurnKey", ["answer", "context", "question"])
+
+class ResponseCache:
+    """
+    Thread-safe in-memory answer cache with LRU + TTL eviction and a memory cap.
+    
+    Values are the response dicts returned by CVChatbot.get_response().
+    """
+    
+    def __init__(self, ttl: float = 86400, max_entries: int = 1000, max_bytes: int = 16 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached value for key, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            stored_at, size, value = entry
+            if time.time() - stored_at > self.ttl:
+                self._remove(key)
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key: str, value: Dict[str, Any]):
+        """Store a value, evicting least recently used entries to respect the caps."""
+        size = self._estimate_size(key, value)
+        if size > self.max_bytes:
+            return
+        
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.time(), size, value)
+            self._bytes += size
+            
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+    
+    def clear(self):
+        """Remove every entry (used when the CV data changes)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._bytes
+            }
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+    
+    @staticmethod
+    def _estimate_size(key: str, value: Dict[str, Any]) -> int:
+        """Approximate memory footprint of an entry in bytes."""
+        return len(key) + len(json.dumps(value, ensure_ascii=False).encode("utf-8")) + 200
@@ -1,73 +1,268 @@
-import os
-from typing import List, Dict, Any, Optional
-import anthropic
+import sqlite3
+from typing import List, Dict, Any, Optional, Iterator, Tuple
 from backend.prompts import get_system_prompt
+from backend.cache import ResponseCache, TurnKey, cv_fingerprint, make_cache_key, make_context_key, normalize_question
+from backend.disk_cache import DiskCache
+from backend.semantic_cache import SemanticCache
+from backend.retrieval import CVRetriever
+from backend.history import build_history_window, count_tokens
+from backend.faq import FAQStore
+from backend.router import ModelRouter
+from backend.extractive import ExtractiveAnswerer
+from config.settings import (
+    ENABLE_PROMPT_CACHING, CACHE_CONVERSATION_HISTORY, CONTEXT_MODE, RETRIEVAL_TOP_K,
+    MAX_CONVERSATION_LENGTH, HISTORY_TOKEN_BUDGET,
+    ANSWER_CACHE_ENABLED, ANSWER_CACHE_TTL, ANSWER_CACHE_MAX_ENTRIES, ANSWER_CACHE_MAX_BYTES, FAQ_FILE,
+    ANSWER_CACHE_BACKEND, ANSWER_CACHE_PATH,
+    DEFAULT_MODEL, MAX_TOKENS, ROUTING_ENABLED, FAST_MODEL, FAST_MAX_TOKENS, EXTRACTIVE_ENABLED,
+    SEMANTIC_CACHE_ENABLED, SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_CAPACITY, SEMANTIC_CACHE_DIM
+)
 
 class CVChatbot:
-    def __init__(self, cv_data: str):
-        self.client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+    """
+    Prompts, caches and local answers for one CV.
+    
+    Model calls (retries, circuit breaker, escalation, coalescing) are made
+    by the AsyncCVChatbot wrapping it on the shared engine, see
+    registry.get_async_chatbot(); get_response() and stream_response() are
+    blocking shortcuts to it.
+    """
+    
+    def __init__(self, cv_data: str, cache: Optional[ResponseCache] = None, context_mode: str = CONTEXT_MODE,
+                 model: str = DEFAULT_MODEL):
         self.cv_data = cv_data
-        self.model = "claude-3-7-sonnet-latest"  # Latest Claude 3.7 Sonnet model
-        self.max_tokens = 1000
+        self.model = model
+        self.max_tokens = MAX_TOKENS
         self.system_prompt = get_system_prompt(cv_data)
+        # In retrieval mode the system prompt holds different CV sections for
+        # each question, so a cached prefix would be rewritten (at 1.25x the
+        # input price) on nearly every turn and rarely read back. The fixed
+        # instructions alone are far shorter than the minimum cacheable prefix.
+        self.prompt_caching = ENABLE_PROMPT_CACHING and context_mode == "full"
+        self.history_token_budget = HISTORY_TOKEN_BUDGET
+        self.max_history_messages = MAX_CONVERSATION_LENGTH
+        self.cv_fingerprint = cv_fingerprint(cv_data)
+        
+        # "full" sends the whole CV, "retrieval" only the relevant sections
+        if context_mode not in ("full", "retrieval"):
+            raise ValueError(f"Unknown context mode: {context_mode}")
+        self.context_mode = context_mode
+        self.retrieval_top_k = RETRIEVAL_TOP_K
+        self.retriever = CVRetriever(cv_data) if context_mode == "retrieval" else None
+        
+        # Answer cache; entries are keyed by CV fingerprint, so a new CV never
+        # serves stale answers
+        if cache is None and ANSWER_CACHE_ENABLED:
+            cache = self._create_cache()
+        self.cache = cache
+        
+        # Paraphrase matching in front of the model, within the same context
+        self.semantic_cache = SemanticCache(
+            threshold=SEMANTIC_CACHE_THRESHOLD,
+            capacity=SEMANTIC_CACHE_CAPACITY,
+            dim=SEMANTIC_CACHE_DIM,
+            ttl=ANSWER_CACHE_TTL
+        ) if SEMANTIC_CACHE_ENABLED else None
         
-    def get_response(self, user_message: str, conversation_history: List[Dict[str, str]] = None) -> Dict[str, Any]:
+        # Offline answers during upstream outages, see AsyncCVChatbot
+        self.faq = FAQStore(FAQ_FILE)
+        
+        # Send short factual lookups to a fast model, escalating weak answers
+        self.router = ModelRouter(FAST_MODEL, self.model) if ROUTING_ENABLED else None
+        
+        # Answer direct factual lookups (email, current role, skills...) locally
+        self.extractive = ExtractiveAnswerer(cv_data) if EXTRACTIVE_ENABLED else None
+        
+        # Async variant on the shared engine, see registry.get_async_chatbot()
+        self.async_chatbot = None
+    
+    def _create_cache(self):
+        """Build the configured answer cache, falling back to memory if the disk store is unusable."""
+        if ANSWER_CACHE_BACKEND == "disk":
+            try:
+                return DiskCache(
+                    ANSWER_CACHE_PATH,
+                    namespace=f"{self.cv_fingerprint}:{self.model}",
+                    ttl=ANSWER_CACHE_TTL,
+                    max_entries=ANSWER_CACHE_MAX_ENTRIES,
+                    max_bytes=ANSWER_CACHE_MAX_BYTES
+                )
+            except (sqlite3.Error, OSError) as e:
+                print(f"Error opening answer cache file, using in-memory cache: {e}")
+        return ResponseCache(
+            ttl=ANSWER_CACHE_TTL,
+            max_entries=ANSWER_CACHE_MAX_ENTRIES,
+            max_bytes=ANSWER_CACHE_MAX_BYTES
+        )
+    
+    def get_response(self, user_message: str, conversation_history: List[Dict[str, str]] = None,
+                     summary: str = "") -> Dict[str, Any]:
         """
-        Get a response from the chatbot.
+        Get a response from the chatbot, blocking until it is complete.
         
         Args:
             user_message: The user's question
             conversation_history: Previous messages in the conversation
-            
+            summary: Running summary of older turns not included in the history
+        
         Returns:
-            Dictionary containing response and metadata
+            Dictionary containing response and metadata, see AsyncCVChatbot.get_response_sync()
+        """
+        from backend.registry import get_async_chatbot
+        return get_async_chatbot(self).get_response_sync(user_message, conversation_history, summary)
+    
+    def stream_response(self, user_message: str, conversation_history: List[Dict[str, str]] = None,
+                        summary: str = "") -> Iterator[Dict[str, Any]]:
         """
-        try:
-            # Prepare messages for the API
-            messages = []
-            
-            # Add conversation history if provided
-            if conversation_history:
-                for msg in conversation_history[-10:]:  # Limit to last 10 messages
-                    messages.append({
-                        "role": msg["role"],
-                        "content": msg["content"]
-                    })
-            
-            # Add current user message
+        Stream a response from the chatbot as it is generated.
+        
+        Yields:
+            {"type": "text", "text": ...} for every text delta, followed by a
+            single final event with the same keys as get_response() plus
+            "type": "done" (or "type": "error" on failure)
+        """
+        from backend.registry import get_async_chatbot
+        return get_async_chatbot(self).stream_response_sync(user_message, conversation_history, summary)
+    
+    def prepare_turn(self, user_message: str, conversation_history: List[Dict[str, str]] = None,
+                     summary: str = "") -> Tuple[TurnKey, Dict[str, Any]]:
+        """Build the answer cache key and the Messages API arguments for a turn."""
+        history = self._history_window(conversation_history)
+        cache_key = TurnKey(
+            answer=make_cache_key(user_message, history, self.cv_fingerprint, self.model, summary),
+            context=make_context_key(history, self.cv_fingerprint, self.model, summary),
+            question=user_message
+        )
+        model = self.router.route(user_message, history) if self.router is not None else self.model
+        request = {
+            "model": model,
+            "max_tokens": FAST_MAX_TOKENS if model != self.model else self.max_tokens,
+            "system": self._system_blocks(self._system_prompt_for(user_message, history), summary),
+            "messages": self._build_messages(user_message, history)
+        }
+        return cache_key, request
+    
+    def _history_window(self, conversation_history: List[Dict[str, str]] = None) -> List[Dict[str, str]]:
+        """Select the newest history that fits the token budget and message limit."""
+        if not conversation_history:
+            return []
+        return build_history_window(conversation_history, self.history_token_budget, self.max_history_messages)
+    
+    def _build_messages(self, user_message: str, history: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """Prepare the messages list for the API from history plus the new question."""
+        messages = []
+        
+        # Add conversation history
+        for msg in history:
             messages.append({
-                "role": "user",
-                "content": user_message
+                "role": msg["role"],
+                "content": msg["content"]
             })
-            
-            # Make API call
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                system=self.system_prompt,
-                messages=messages
-            )
-            
-            return {
-                "success": True,
-                "response": response.content[0].text,
-                "tokens_used": {
-                    "input": response.usage.input_tokens,
-                    "output": response.usage.output_tokens,
-                    "total": response.usage.input_tokens + response.usage.output_tokens
-                }
-            }
-            
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-                "response": "I apologize, but I encountered an error processing your request. Please try again."
+        
+        # Mark the end of the history as a cache breakpoint so the next turn
+        # can reuse everything up to here
+        if messages and self.prompt_caching and CACHE_CONVERSATION_HISTORY:
+            messages[-1] = {
+                "role": messages[-1]["role"],
+                "content": [{
+                    "type": "text",
+                    "text": messages[-1]["content"],
+                    "cache_control": {"type": "ephemeral"}
+                }]
             }
+        
+        # Add current user message
+        messages.append({
+            "role": "user",
+            "content": user_message
+        })
+        
+        return messages
+    
+    def local_answer(self, user_message: str, cache_key: TurnKey, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Answer without a model call if possible: exact cache, semantic cache, extractive lookup."""
+        cached = self._cache_lookup(cache_key)
+        if cached is not None or self.extractive is None:
+            return cached
+        
+        # Only context-free questions; follow-ups need the conversation
+        if len(request["messages"]) != 1 or len(request["system"]) != 1:
+            return None
+        answer = self.extractive.answer(user_message)
+        if answer is None:
+            return None
+        return {
+            "success": True,
+            "response": answer,
+            "cached": False,
+            "extractive": True,
+            "extractive_stats": self.extractive.stats(),
+            "tokens_used": {"input": 0, "output": 0, "cache_read": 0, "cache_write": 0, "total": 0}
+        }
+    
+    def _cache_lookup(self, cache_key: TurnKey) -> Optional[Dict[str, Any]]:
+        """Return a cached answer (exact or paraphrase match) marked as a cache hit, or None."""
+        cached = self.cache.get(cache_key.answer) if self.cache is not None else None
+        extra = {}
+        if cached is None and self.semantic_cache is not None:
+            match = self.semantic_cache.get(cache_key.context, cache_key.question)
+            if match is not None:
+                cached = {"success": True, "response": match["response"]}
+                extra = {"semantic_match": True, "similarity": match["similarity"]}
+        if cached is None:
+            return None
+        
+        # A cache hit costs no tokens
+        return dict(
+            cached,
+            cached=True,
+            tokens_used={"input": 0, "output": 0, "cache_read": 0, "cache_write": 0, "total": 0},
+            cache_stats=self.cache.stats() if self.cache is not None else {},
+            **extra
+        )
+    
+    def remember_answer(self, cache_key: TurnKey, request: Dict[str, Any], response: str):
+        """Store an answer from the model in the answer caches and, if context-free, the FAQ store."""
+        if self.cache is not None:
+            self.cache.set(cache_key.answer, {"success": True, "response": response})
+        if self.semantic_cache is not None:
+            self.semantic_cache.add(cache_key.context, cache_key.question, response)
+        
+        # Answers given without prior context (no history, no summary block)
+        # are reusable as offline answers
+        if len(request["messages"]) == 1 and len(request["system"]) == 1:
+            self.faq.add(request["messages"][0]["content"], response)
+    
+    def _system_prompt_for(self, user_message: str, history: List[Dict[str, str]]) -> str:
+        """Return the system prompt for this turn according to the context mode."""
+        if self.retriever is None:
+            return self.system_prompt
+        
+        # Include the previous question so follow-ups keep their topic
+        previous_questions = [msg["content"] for msg in history if msg["role"] == "user"]
+        query = " ".join(previous_questions[-1:] + [normalize_question(user_message)])
+        context = self.retriever.build_context(query, self.retrieval_top_k)
+        if not context:
+            return self.system_prompt
+        return get_system_prompt(context)
+    
+    def _system_blocks(self, system_prompt: str, summary: str = "") -> Any:
+        """Return the system prompt, marked as cacheable when prompt caching is on."""
+        blocks = [{"type": "text", "text": system_prompt}]
+        if self.prompt_caching:
+            blocks[0]["cache_control"] = {"type": "ephemeral"}
+        
+        # The summary changes every few turns, so it goes after the cached prefix
+        if summary:
+            blocks.append({
+                "type": "text",
+                "text": f"Summary of the earlier conversation with this visitor:\n{summary}"
+            })
+        return blocks
     
     def estimate_tokens(self, text: str) -> int:
         """Rough estimation of tokens (approximately 4 characters per token)."""
-        return len(text) // 4
+        return count_tokens(text)
     
     def get_conversation_cost(self, total_tokens: int) -> float:
         """
@@ -83,4 +278,4 @@ class CVChatbot:
         input_cost = (input_tokens / 1_000_000) * 3.0
         output_cost = (output_tokens / 1_000_000) * 15.0
         
-        return input_cost + output_cost
\ No newline at end of file
+        return input_cost + output_cost
@@ -0,0 +1,131 @@
+import time
+import threading
+from collections import deque, namedtuple
+from typing import Dict, Any
+from config.settings import (
+    BREAKER_WINDOW, BREAKER_MIN_CALLS, BREAKER_FAILURE_RATE, BREAKER_SLOW_CALL_SECONDS,
+    BREAKER_SLOW_CALL_RATE, BREAKER_OPEN_SECONDS
+)
+
+# Answer of CircuitBreaker.allow_request(). probe is True for the single call
+# let through while half-open; epoch identifies the state it was admitted in.
+Admission = namedtuple("Admission", ["allowed", "probe", "epoch"])
+
+class CircuitBreaker:
+    """
+    Circuit breaker around upstream model calls.
+    
+    Closed: calls go through and outcomes are recorded in a rolling window.
+    Open: calls fail fast until open_seconds have passed, after which one
+    probe call is let through (half-open); its outcome closes or re-opens
+    the circuit.
+    
+    Callers pass the Admission they were given back with the outcome.
+    Outcomes of calls admitted before the last state change are ignored,
+    so a slow call from before an outage cannot close the circuit or free
+    the probe slot while the real probe is still running.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, window: int = BREAKER_WINDOW, min_calls: int = BREAKER_MIN_CALLS,
+                 failure_rate: float = BREAKER_FAILURE_RATE, slow_call_seconds: float = BREAKER_SLOW_CALL_SECONDS,
+                 slow_call_rate: float = BREAKER_SLOW_CALL_RATE, open_seconds: float = BREAKER_OPEN_SECONDS):
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._outcomes = deque(maxlen=window)  # (failed, slow) per call
+        self._probe_in_flight = False
+        self._epoch = 0  # Incremented on every state change
+        self._lock = threading.Lock()
+    
+    def allow_request(self) -> Admission:
+        """Decide whether a call may go upstream now, and whether it is the half-open probe."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return Admission(True, False, self._epoch)
+            
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.open_seconds:
+                self._set_state(self.HALF_OPEN)
+            
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return Admission(True, True, self._epoch)
+            
+            self.rejected += 1
+            return Admission(False, False, self._epoch)
+    
+    def record_success(self, duration: float, admission: Admission):
+        """Record a successful call and how long it took."""
+        with self._lock:
+            if admission.epoch != self._epoch:
+                return
+            if self.state == self.HALF_OPEN and admission.probe:
+                self._close()
+            elif self.state == self.CLOSED:
+                self._outcomes.append((False, duration >= self.slow_call_seconds))
+                self._maybe_trip()
+    
+    def record_failure(self, duration: float, admission: Admission):
+        """Record a failed call (after retries)."""
+        with self._lock:
+            if admission.epoch != self._epoch:
+                return
+            if self.state == self.HALF_OPEN and admission.probe:
+                self._trip()
+            elif self.state == self.CLOSED:
+                self._outcomes.append((True, duration >= self.slow_call_seconds))
+                self._maybe_trip()
+    
+    def release(self, admission: Admission):
+        """
+        Free the half-open probe slot if this call holds it and recorded no outcome.
+        
+        Client errors and abandoned or cancelled calls say nothing about
+        upstream health; without this the circuit would stay half-open and
+        reject every later call. Callers run it in a finally block, where it
+        is a no-op for calls that are not the current probe.
+        """
+        with self._lock:
+            if admission.probe and admission.epoch == self._epoch and self.state == self.HALF_OPEN:
+                self._probe_in_flight = False
+    
+    def stats(self) -> Dict[str, Any]:
+        """Current state and window counters."""
+        with self._lock:
+            return {
+                "state": self.state,
+                "calls": len(self._outcomes),
+                "failures": sum(1 for failed, _ in self._outcomes if failed),
+                "slow": sum(1 for _, slow in self._outcomes if slow),
+                "rejected": self.rejected
+            }
+    
+    def _maybe_trip(self):
+        calls = len(self._outcomes)
+        if self.state != self.CLOSED or calls < self.min_calls:
+            return
+        failures = sum(1 for failed, _ in self._outcomes if failed)
+        slow = sum(1 for _, slow in self._outcomes if slow)
+        if failures / calls >= self.failure_rate or slow / calls >= self.slow_call_rate:
+            self._trip()
+    
+    def _trip(self):
+        self._set_state(self.OPEN)
+        self.opened_at = time.monotonic()
+    
+    def _close(self):
+        self._set_state(self.CLOSED)
+        self._outcomes.clear()
+    
+    def _set_state(self, state: str):
+        self.state = state
+        self._epoch += 1
+        self._probe_in_flight = False
@@ -0,0 +1,55 @@
+import os
+import threading
+from pathlib import Path
+from typing import List, Callable, Optional, Tuple
+
+class FileWatcher:
+    """
+    Polls the modification time and size of a few files in a daemon thread.
+    
+    Calls on_change() when any of them was created, changed or removed.
+    The callback decides whether the content actually changed (e.g. by
+    hashing it), so a touch without edits costs one reload of the text.
+    """
+    
+    def __init__(self, paths: List[Path], on_change: Callable[[], None], interval: float = 5.0):
+        self.paths = [Path(path) for path in paths]
+        self.on_change = on_change
+        self.interval = interval
+        self._signature = self._stat()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        """Start polling in the background."""
+        self._thread = threading.Thread(target=self._run, name="cv-watcher", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+    
+    def check(self) -> bool:
+        """Poll once; returns True if a change was detected and handled."""
+        signature = self._stat()
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        self.on_change()
+        return True
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"Error reloading CV data: {e}")
+    
+    def _stat(self) -> Tuple[Optional[Tuple[int, int]], ...]:
+        signature = []
+        for path in self.paths:
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
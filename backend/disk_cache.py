@@ -0,0 +1,156 @@
+import json
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+from backend.sqlite_store import SQLiteStore
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS answers_last_used ON answers (last_used);
+"""
+
+class DiskCache(SQLiteStore):
+    """
+    Persistent answer cache in a SQLite database, with the ResponseCache interface.
+    
+    Survives restarts and is shared by every process using the same file.
+    Entries are namespaced (CV fingerprint and model), so clear() only
+    drops the current CV's answers. The entry and byte caps apply to the
+    whole file and evict least recently used entries across namespaces.
+    
+    A locked, full or broken database file never fails a turn: errors are
+    logged, reads count as misses and writes are skipped.
+    """
+    
+    # Last-used times are only refreshed when older than this, so most hits
+    # are pure reads
+    TOUCH_INTERVAL = 60
+    
+    def __init__(self, path: Path, namespace: str, ttl: float = 86400, max_entries: int = 1000,
+                 max_bytes: int = 16 * 1024 * 1024, busy_timeout: float = 5.0):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        super().__init__(path, _SCHEMA, busy_timeout)
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached value for key, or None if missing, expired or unreadable."""
+        try:
+            return self._get(key)
+        except sqlite3.Error as e:
+            print(f"Error reading answer cache, treating it as a miss: {e}")
+            self._count(hit=False)
+            return None
+    
+    def set(self, key: str, value: Dict[str, Any]):
+        """Store a value, evicting least recently used entries to respect the caps."""
+        try:
+            self._set(key, value)
+        except sqlite3.Error as e:
+            print(f"Error writing answer cache, answer not cached: {e}")
+    
+    def clear(self):
+        """Remove every entry of this namespace (used when the CV data changes)."""
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM answers WHERE namespace = ?", (self.namespace,))
+        except sqlite3.Error as e:
+            print(f"Error clearing answer cache: {e}")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size of this namespace (None if unreadable)."""
+        try:
+            entries, size = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM answers WHERE namespace = ?", (self.namespace,)
+            ).fetchone()
+        except sqlite3.Error:
+            entries = size = None
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
+    
+    def __len__(self) -> int:
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM answers WHERE namespace = ?", (self.namespace,)
+        ).fetchone()[0]
+    
+    def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT value, stored_at, last_used FROM answers WHERE namespace = ? AND key = ?",
+            (self.namespace, key)
+        ).fetchone()
+        
+        if row is None or now - row[1] > self.ttl:
+            if row is not None:
+                with conn:
+                    conn.execute("DELETE FROM answers WHERE namespace = ? AND key = ?", (self.namespace, key))
+            self._count(hit=False)
+            return None
+        
+        if now - row[2] > self.TOUCH_INTERVAL:
+            try:
+                with conn:
+                    conn.execute(
+                        "UPDATE answers SET last_used = ? WHERE namespace = ? AND key = ?",
+                        (now, self.namespace, key)
+                    )
+            except sqlite3.Error:
+                pass  # Only affects eviction order; the hit stands
+        self._count(hit=True)
+        return json.loads(row[0])
+    
+    def _set(self, key: str, value: Dict[str, Any]):
+        payload = json.dumps(value, ensure_ascii=False)
+        size = len(key) + len(payload.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO answers (namespace, key, value, size, stored_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self.namespace, key, payload, size, now, now)
+            )
+            conn.execute("DELETE FROM answers WHERE stored_at < ?", (now - self.ttl,))
+            self._evict(conn)
+    
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop least recently used entries until both caps hold."""
+        entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM answers").fetchone()
+        if entries <= self.max_entries and size <= self.max_bytes:
+            return
+        
+        excess_entries = entries - self.max_entries
+        excess_bytes = size - self.max_bytes
+        doomed = []
+        for rowid, entry_size in conn.execute("SELECT rowid, size FROM answers ORDER BY last_used"):
+            if excess_entries <= 0 and excess_bytes <= 0:
+                break
+            doomed.append((rowid,))
+            excess_entries -= 1
+            excess_bytes -= entry_size
+        conn.executemany("DELETE FROM answers WHERE rowid = ?", doomed)
+    
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
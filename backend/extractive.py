@@ -0,0 +1,237 @@
+import re
+import threading
+from typing import List, Dict, Any, Optional
+from backend.retrieval import split_sections
+
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_PHONE = re.compile(r"\+?\d[\d ()/-]{7,}\d")
+_PHONE_MIN_DIGITS = 9  # Shorter digit runs are years, dates or postcodes
+_URL = re.compile(r"(?:https?://|www\.)[^\s)>\]]+|(?:linkedin\.com|github\.com)/[^\s)>\]]+", re.IGNORECASE)
+_YEAR = r"(?:\d{1,2}[./])?(?:19|20)\d{2}"
+_OPEN_END = r"present|today|now|current|heute|jetzt|aktuell"
+_DATE_RANGE = re.compile(
+    rf"({_YEAR})\s*(?:-|–|—|to|bis)\s*({_YEAR}|{_OPEN_END})|(?:since|seit)\s+({_YEAR})",
+    re.IGNORECASE
+)
+_BULLET = re.compile(r"^\s*(?:[-*•]|\d+\.)\s+")
+_MARKUP = re.compile(r"[#*_`]+")
+
+# Section titles (lowercased substrings) for each kind of CV section
+_EXPERIENCE_TITLES = ("experience", "employment", "work", "career", "berufserfahrung", "erfahrung", "position")
+_SKILL_TITLES = ("skill", "kenntnisse", "competenc", "kompetenz", "technolog", "expertise", "tools")
+_EDUCATION_TITLES = ("education", "ausbildung", "studium", "degree", "academic", "bildung")
+_REFERENCE_TITLES = ("reference", "referenz", "recommendation", "empfehlung")
+
+def _clean(line: str) -> str:
+    """Strip bullets, markdown markup and surrounding whitespace from a line."""
+    return _MARKUP.sub("", _BULLET.sub("", line)).strip(" :-–|\t")
+
+def _matches(title: str, keywords) -> bool:
+    title = title.lower()
+    return any(keyword in title for keyword in keywords)
+
+class CVProfile:
+    """
+    Structured view of the CV text: contact details, roles, skills,
+    education and references, parsed with simple heuristics.
+    """
+    
+    def __init__(self, cv_data: str):
+        self.sections = split_sections(cv_data)
+        self.emails = list(dict.fromkeys(_EMAIL.findall(cv_data)))
+        self.phones = self._parse_phones(cv_data)
+        self.links = list(dict.fromkeys(_URL.findall(cv_data)))
+        self.roles: List[Dict[str, Any]] = []
+        self.skills: List[str] = []
+        self.education: List[str] = []
+        self.references: List[str] = []
+        
+        for section in self.sections:
+            title = section["title"]
+            body = section["text"].splitlines()[1:] if title else section["text"].splitlines()
+            if _matches(title, _REFERENCE_TITLES):
+                self.references.extend(self._parse_references(body))
+            elif _matches(title, _SKILL_TITLES):
+                self.skills.extend(self._parse_skills(body))
+            elif _matches(title, _EDUCATION_TITLES):
+                self.education.extend(_clean(line) for line in body if _clean(line))
+            elif _matches(title, _EXPERIENCE_TITLES):
+                self.roles.extend(self._parse_roles(body))
+    
+    @property
+    def current_role(self) -> Optional[Dict[str, Any]]:
+        """The open-ended role, or failing that the one that started last."""
+        current = [role for role in self.roles if role["current"]]
+        if current:
+            return current[0]
+        dated = [role for role in self.roles if role["start"]]
+        return max(dated, key=lambda role: role["start"]) if dated else None
+    
+    @staticmethod
+    def _parse_phones(cv_data: str) -> List[str]:
+        """Phone numbers, leaving out date ranges such as "2018 - 2021"."""
+        phones = []
+        for match in _PHONE.findall(_DATE_RANGE.sub(" ", cv_data)):
+            if sum(char.isdigit() for char in match) >= _PHONE_MIN_DIGITS:
+                phones.append(match.strip())
+        return list(dict.fromkeys(phones))
+    
+    @staticmethod
+    def _parse_roles(lines: List[str]) -> List[Dict[str, Any]]:
+        """Every line carrying a date range is taken as a role heading."""
+        roles = []
+        for line in lines:
+            match = _DATE_RANGE.search(line)
+            if not match:
+                continue
+            start = match.group(1) or match.group(3)
+            end = match.group(2) or "present"
+            heading = _clean(_DATE_RANGE.sub("", line).replace("()", ""))
+            if not heading:
+                continue
+            roles.append({
+                "heading": heading,
+                "start": int(start[-4:]),
+                "end": end,
+                "current": bool(re.fullmatch(_OPEN_END, end, re.IGNORECASE)),
+                "dates": match.group(0)
+            })
+        return roles
+    
+    @staticmethod
+    def _parse_skills(lines: List[str]) -> List[str]:
+        """Split "Category: a, b, c" and bullet lists into individual skills."""
+        skills = []
+        for line in lines:
+            line = _clean(line)
+            if not line:
+                continue
+            if ":" in line:
+                line = line.split(":", 1)[1]
+            skills.extend(item.strip() for item in re.split(r"[,;•|]", line) if item.strip())
+        return list(dict.fromkeys(skills))
+    
+    @staticmethod
+    def _parse_references(lines: List[str]) -> List[str]:
+        """Reference names are the sub-headings or bold lead-ins of the section."""
+        names = []
+        for line in lines:
+            if line.startswith("### "):
+                names.append(_clean(line))
+            else:
+                bold = re.match(r"^\s*(?:[-*•]\s+)?\*\*([^*]+)\*\*", line)
+                if bold:
+                    names.append(bold.group(1).strip(" :"))
+        return list(dict.fromkeys(name for name in names if name))
+
+class ExtractiveAnswerer:
+    """
+    Answers direct factual questions from the parsed CV without a model call.
+    
+    Only answers when the question clearly asks for one kind of fact and
+    that fact was found in the CV; otherwise returns None so the caller can
+    fall back to the model.
+    """
+    
+    # Patterns are anchored to the whole question, so only plain lookups
+    # ("What is Paul's email?") match, not questions that merely mention a
+    # topic ("Does Paul have a GitHub?", "What skills does Paul lack?")
+    _WHAT_IS = r"^(?:what|which)(?:'s|\s+is|\s+are)\s+"
+    _OWNER = r"(?:(?:the|his|her|their|\w+(?:'s|’s|s'|s))\s+)?"
+    _OF_WHOM = r"(?:\s+(?:of|for)\s+\w+)?\s*\??$"
+    INTENTS = [
+        ("email", re.compile(_WHAT_IS + _OWNER + r"(?:e-?mail(?:\s+address(?:es)?)?|mail\s+address)" + _OF_WHOM, re.IGNORECASE)),
+        ("phone", re.compile(_WHAT_IS + _OWNER + r"(?:(?:tele)?phone|mobile|contact)(?:\s+number)?" + _OF_WHOM, re.IGNORECASE)),
+        ("linkedin", re.compile(_WHAT_IS + _OWNER + r"linkedin(?:\s+(?:profile|url|page))?" + _OF_WHOM, re.IGNORECASE)),
+        ("github", re.compile(_WHAT_IS + _OWNER + r"github(?:\s+(?:profile|url|page|account))?" + _OF_WHOM, re.IGNORECASE)),
+        ("website", re.compile(_WHAT_IS + _OWNER + r"(?:website|homepage|portfolio)(?:\s+url)?" + _OF_WHOM, re.IGNORECASE)),
+        ("current_role", re.compile(
+            _WHAT_IS + _OWNER + r"(?:current|present)\s+(?:role|job|position|job\s+title|title|employer)" + _OF_WHOM,
+            re.IGNORECASE
+        )),
+        ("current_role", re.compile(
+            r"^(?:what\s+does\s+\w+\s+(?:currently\s+)?do|where\s+does\s+\w+\s+(?:currently\s+)?work|"
+            r"who\s+does\s+\w+\s+(?:currently\s+)?work\s+for)(?:\s+(?:now|currently|today|these\s+days))?\s*\??$",
+            re.IGNORECASE
+        )),
+        ("skills", re.compile(
+            _WHAT_IS + _OWNER + r"(?:(?:main|key|core|technical|professional)\s+)*(?:skills|technologies|tech\s+stack|tools)"
+            + _OF_WHOM, re.IGNORECASE
+        )),
+        ("skills", re.compile(r"^(?:what|which)\s+(?:skills|technologies|tools)\s+does\s+\w+\s+(?:have|know|use)\s*\??$", re.IGNORECASE)),
+        ("education", re.compile(_WHAT_IS + _OWNER + r"(?:education(?:al\s+background)?|degrees?)" + _OF_WHOM, re.IGNORECASE)),
+        ("education", re.compile(r"^where\s+did\s+\w+\s+(?:study|graduate)\s*\??$", re.IGNORECASE)),
+        ("references", re.compile(
+            r"^(?:who|what)(?:'s|\s+is|\s+are)\s+" + _OWNER + r"(?:professional\s+)?references?" + _OF_WHOM, re.IGNORECASE
+        ))
+    ]
+    
+    # Questions these lookups cannot settle: judgement, negation,
+    # comparison and anything about other points in time
+    _NOT_A_LOOKUP = re.compile(
+        r"\b(why|how|compare|strongest|best|opinion|describe|explain|tell me about|"
+        r"not|no|never|lack\w*|missing|without|weak\w*|than|versus|vs|better|worse|more|less|most|least|"
+        r"before|previous\w*|prior|former\w*|earlier|last|past|next|future|looking|plan\w*)\b|n't\b",
+        re.IGNORECASE
+    )
+    
+    def __init__(self, cv_data: str, max_words: int = 14):
+        self.profile = CVProfile(cv_data)
+        self.max_words = max_words
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+    
+    def answer(self, question: str) -> Optional[str]:
+        """Return a local answer to the question, or None if not confident."""
+        answer = self._answer(question)
+        with self._lock:
+            if answer is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return answer
+    
+    def stats(self) -> Dict[str, int]:
+        """Hit and miss counters."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+    
+    def _answer(self, question: str) -> Optional[str]:
+        question = question.strip()
+        if len(question.split()) > self.max_words or self._NOT_A_LOOKUP.search(question):
+            return None
+        
+        intents = {name for name, pattern in self.INTENTS if pattern.match(question)}
+        if len(intents) != 1:
+            return None
+        intent = intents.pop()
+        profile = self.profile
+        
+        if intent == "email" and profile.emails:
+            return f"The email address given in the CV is {', '.join(profile.emails)}."
+        if intent == "phone" and profile.phones:
+            return f"The phone number given in the CV is {', '.join(profile.phones)}."
+        if intent in ("linkedin", "github", "website"):
+            links = [link for link in profile.links if self._link_kind(link) == intent]
+            if links:
+                return "Given in the CV:\n" + "\n".join(f"- {link}" for link in links)
+        if intent == "current_role" and profile.current_role:
+            role = profile.current_role
+            return f"The current role listed in the CV is {role['heading']} ({role['dates']})."
+        if intent == "skills" and profile.skills:
+            return "Skills listed in the CV:\n" + "\n".join(f"- {skill}" for skill in profile.skills)
+        if intent == "education" and profile.education:
+            return "Education listed in the CV:\n" + "\n".join(f"- {entry}" for entry in profile.education)
+        if intent == "references" and profile.references:
+            return "Professional references:\n" + "\n".join(f"- {name}" for name in profile.references)
+        return None
+    
+    @staticmethod
+    def _link_kind(link: str) -> str:
+        link = link.lower()
+        if "linkedin.com" in link:
+            return "linkedin"
+        if "github.com" in link:
+            return "github"
+        return "website"
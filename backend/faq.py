@@ -0,0 +1,43 @@
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+from backend.cache import normalize_question
+
+class FAQStore:
+    """
+    Local store of answers to common questions, used when the model is unavailable.
+    
+    Filled from successful first-turn answers (including the warm-up of
+    suggested questions) and optionally seeded from a JSON file mapping
+    questions to answers.
+    """
+    
+    def __init__(self, seed_file: Optional[Path] = None, max_entries: int = 500):
+        self.max_entries = max_entries
+        self._answers: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        if seed_file is not None and Path(seed_file).exists():
+            try:
+                with open(seed_file, 'r', encoding='utf-8') as f:
+                    for question, answer in json.load(f).items():
+                        self.add(question, answer)
+            except Exception as e:
+                print(f"Error loading FAQ file: {e}")
+    
+    def add(self, question: str, answer: str):
+        """Remember the answer to a question asked without prior context."""
+        key = normalize_question(question)
+        with self._lock:
+            if key not in self._answers and len(self._answers) >= self.max_entries:
+                # Drop the oldest entry (dicts keep insertion order)
+                self._answers.pop(next(iter(self._answers)))
+            self._answers[key] = answer
+    
+    def lookup(self, question: str) -> Optional[str]:
+        """Return the stored answer for a question, or None."""
+        with self._lock:
+            return self._answers.get(normalize_question(question))
+    
+    def __len__(self) -> int:
+        return len(self._answers)
@@ -0,0 +1,59 @@
+from functools import lru_cache
+from typing import List, Dict
+
+@lru_cache(maxsize=4096)
+def count_tokens(text: str) -> int:
+    """
+    Estimate the token count of a message text (about 4 characters per token).
+    
+    Results are memoized, so each message is only counted once no matter
+    how many turns it stays in the window.
+    """
+    return max(1, len(text) // 4)
+
+def build_history_window(history: List[Dict[str, str]], token_budget: int, max_messages: int) -> List[Dict[str, str]]:
+    """
+    Select the newest messages that fit into a token budget.
+    
+    The result always starts with a user message, alternates roles and ends
+    with an assistant message, so appending the new user question yields a
+    valid Messages API request.
+    
+    Args:
+        history: Full conversation history, oldest first
+        token_budget: Maximum estimated tokens for the selected messages
+        max_messages: Maximum number of messages to select
+        
+    Returns:
+        The selected messages, oldest first
+    """
+    # Collapse consecutive messages from the same role (e.g. after a failed turn)
+    alternating: List[Dict[str, str]] = []
+    for msg in history or []:
+        if alternating and alternating[-1]["role"] == msg["role"]:
+            alternating[-1] = {
+                "role": msg["role"],
+                "content": f"{alternating[-1]['content']}\n\n{msg['content']}"
+            }
+        else:
+            alternating.append({"role": msg["role"], "content": msg["content"]})
+    
+    # The new question follows, so the window has to end on an assistant turn
+    while alternating and alternating[-1]["role"] != "assistant":
+        alternating.pop()
+    
+    window: List[Dict[str, str]] = []
+    used = 0
+    for msg in reversed(alternating):
+        cost = count_tokens(msg["content"])
+        if len(window) >= max_messages or used + cost > token_budget:
+            break
+        window.append(msg)
+        used += cost
+    window.reverse()
+    
+    # The first message sent must come from the user
+    while window and window[0]["role"] != "user":
+        window.pop(0)
+    
+    return window
@@ -0,0 +1,127 @@
+import time
+import sqlite3
+from collections import namedtuple
+from pathlib import Path
+from typing import List, Dict
+from backend.sqlite_store import SQLiteStore
+from config.settings import CACHE_READ_TOKEN_WEIGHT, CACHE_WRITE_TOKEN_WEIGHT
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    key TEXT PRIMARY KEY,
+    level REAL NOT NULL,
+    updated REAL NOT NULL
+);
+"""
+
+# Outcome of a check: retry_after is the wait in seconds when not allowed
+RateLimitDecision = namedtuple("RateLimitDecision", ["allowed", "reason", "retry_after"])
+
+HOUR = 3600
+DAY = 24 * 3600
+
+def billed_tokens(tokens_used: Dict[str, int]) -> int:
+    """Tokens a turn counts against the limits: prompt cache reads and writes at their billed rate."""
+    return round(
+        tokens_used["input"] + tokens_used["output"]
+        + tokens_used["cache_read"] * CACHE_READ_TOKEN_WEIGHT
+        + tokens_used["cache_write"] * CACHE_WRITE_TOKEN_WEIGHT
+    )
+
+class RateLimiter(SQLiteStore):
+    """
+    Token-bucket limits on questions and model tokens, stored in SQLite.
+    
+    Every identity (session, login token, client address) has a request bucket
+    holding requests_per_hour and a token bucket holding tokens_per_day,
+    both refilling continuously. All sessions also draw from one global
+    daily token budget. Since the tokens a question costs are only known
+    afterwards, check() requires the token buckets to be non-empty and
+    charge_tokens() deducts the actual usage, possibly into debt.
+    
+    State is shared by every process using the same file. Each call is one
+    transaction touching a fixed number of rows. A full bucket behaves like
+    a missing row, so buckets that have refilled are deleted every
+    SWEEP_INTERVAL seconds and the table only holds recently active
+    identities.
+    """
+    
+    SWEEP_INTERVAL = 600
+    
+    def __init__(self, path: Path, requests_per_hour: int, tokens_per_day: int, global_tokens_per_day: int):
+        self.requests_per_hour = requests_per_hour
+        self.tokens_per_day = tokens_per_day
+        self.global_tokens_per_day = global_tokens_per_day
+        self._last_sweep = 0.0
+        super().__init__(path, _SCHEMA)
+    
+    def check(self, identities: List[str]) -> RateLimitDecision:
+        """
+        Admit one question for the given identities, or explain why not.
+        
+        Nothing is consumed when the question is refused.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            if now - self._last_sweep >= self.SWEEP_INTERVAL:
+                self._last_sweep = now
+                self._sweep(conn, now)
+            levels = {}
+            for identity in identities:
+                levels[f"req:{identity}"] = self._level(conn, f"req:{identity}", self.requests_per_hour, HOUR, now)
+                levels[f"tok:{identity}"] = self._level(conn, f"tok:{identity}", self.tokens_per_day, DAY, now)
+            global_level = self._level(conn, "tok:global", self.global_tokens_per_day, DAY, now)
+            
+            if global_level <= 0:
+                return RateLimitDecision(False, "global_tokens", self._refill_time(global_level, self.global_tokens_per_day, DAY))
+            for identity in identities:
+                level = levels[f"req:{identity}"]
+                if level < 1:
+                    return RateLimitDecision(False, "requests", self._refill_time(level - 1, self.requests_per_hour, HOUR))
+                level = levels[f"tok:{identity}"]
+                if level <= 0:
+                    return RateLimitDecision(False, "tokens", self._refill_time(level, self.tokens_per_day, DAY))
+            
+            for identity in identities:
+                self._store(conn, f"req:{identity}", levels[f"req:{identity}"] - 1, now)
+            return RateLimitDecision(True, None, 0.0)
+    
+    def charge_tokens(self, identities: List[str], tokens: int):
+        """Deduct the tokens a question actually used from every token bucket involved."""
+        if tokens <= 0:
+            return
+        now = time.time()
+        with self._transaction() as conn:
+            keys = [(f"tok:{identity}", self.tokens_per_day) for identity in identities]
+            keys.append(("tok:global", self.global_tokens_per_day))
+            for key, capacity in keys:
+                self._store(conn, key, self._level(conn, key, capacity, DAY, now) - tokens, now)
+    
+    def _sweep(self, conn: sqlite3.Connection, now: float):
+        """Delete buckets that have refilled completely."""
+        for pattern, capacity, period in (
+            ("req:%", self.requests_per_hour, HOUR),
+            ("tok:%", self.tokens_per_day, DAY)
+        ):
+            conn.execute(
+                "DELETE FROM buckets WHERE key LIKE ? AND key != 'tok:global' AND level + (? - updated) * ? >= ?",
+                (pattern, now, capacity / period, capacity)
+            )
+    
+    @staticmethod
+    def _refill_time(level: float, capacity: float, period: float) -> float:
+        """Seconds until a bucket at this level is back above zero."""
+        return max(0.0, -level) * period / capacity + 1
+    
+    @staticmethod
+    def _level(conn: sqlite3.Connection, key: str, capacity: float, period: float, now: float) -> float:
+        """Current level of a bucket refilling capacity tokens per period; a missing row is a full bucket."""
+        row = conn.execute("SELECT level, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return float(capacity)
+        level, updated = row
+        return min(float(capacity), level + (now - updated) * capacity / period)
+    
+    @staticmethod
+    def _store(conn: sqlite3.Connection, key: str, level: float, now: float):
+        conn.execute("INSERT OR REPLACE INTO buckets (key, level, updated) VALUES (?, ?, ?)", (key, level, now))
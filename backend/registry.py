@@ -0,0 +1,201 @@
+import threading
+from typing import Dict, Optional, Tuple
+import anthropic
+from backend.cache import cv_fingerprint
+from backend.prompts import get_suggested_questions
+from config.settings import (
+    get_config, invalidate_config, CV_DATA_FILE, SECRETS_FILES, CV_RELOAD_ENABLED, CV_RELOAD_INTERVAL,
+    APP_TITLE, APP_ICON, DEFAULT_MODEL, PROFILES_DIR, MAX_ACTIVE_TENANTS,
+    WARMUP_ENABLED, RATE_LIMIT_PATH, MAX_REQUESTS_PER_HOUR, MAX_TOKENS_PER_DAY, GLOBAL_MAX_TOKENS_PER_DAY
+)
+
+# Process-wide singletons shared by every Streamlit session
+_lock = threading.RLock()
+_build_lock = threading.Lock()  # Serializes chatbot builds without blocking readers
+_watcher: Optional["FileWatcher"] = None
+_client: Optional[anthropic.Anthropic] = None
+_chatbots: Dict[str, "CVChatbot"] = {}
+_summarizer: Optional["ConversationSummarizer"] = None
+_engine: Optional["AsyncEngine"] = None
+_tenants: Optional["TenantRegistry"] = None
+_rate_limiter: Optional["RateLimiter"] = None
+
+def get_client() -> anthropic.Anthropic:
+    """Return the shared Anthropic client (one HTTP connection pool per process)."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                # Retries are left to the caller, not the SDK
+                _client = anthropic.Anthropic(api_key=get_config().anthropic_api_key, max_retries=0)
+    return _client
+
+def get_chatbot(cv_data: str) -> "CVChatbot":
+    """
+    Return the shared CVChatbot for this CV text, creating it on first use.
+    
+    The chatbot only holds immutable data (CV text, system prompt) and caches,
+    so a single instance can serve every session. Per-session state such as
+    the message list and token counters stays in st.session_state.
+    
+    A chatbot for new CV text is built outside the registry lock and then
+    swapped in with a single assignment: turns already running keep the
+    instance they started with, new turns get the new one.
+    """
+    global _chatbots
+    from backend.chatbot import CVChatbot
+    from backend.warmup import start_warm_up
+    
+    key = cv_fingerprint(cv_data)
+    chatbot = _chatbots.get(key)
+    if chatbot is None:
+        with _build_lock:
+            chatbot = _chatbots.get(key)
+            if chatbot is None:
+                chatbot = CVChatbot(cv_data)
+                # Only the current CV version is kept alive
+                previous = _chatbots
+                _chatbots = {key: chatbot}
+                for old in previous.values():
+                    _invalidate(old)
+        
+        # Fill the answer cache for suggested questions without blocking
+        if WARMUP_ENABLED:
+            start_warm_up(chatbot)
+    return chatbot
+
+def get_current_chatbot() -> "CVChatbot":
+    """
+    Return the chatbot for the configured CV (get_config().cv_data).
+    
+    Also starts the watcher that reloads the CV when its file or the
+    secrets change, so sessions calling this per turn follow CV updates
+    without a restart.
+    """
+    for chatbot in _chatbots.values():
+        break
+    else:
+        chatbot = get_chatbot(get_config().cv_data)
+    if CV_RELOAD_ENABLED and _watcher is None:
+        _start_watcher()
+    return chatbot
+
+def reload_cv():
+    """Reload secrets and CV text; rebuilds the chatbot only if the CV text changed."""
+    invalidate_config()
+    get_chatbot(get_config().cv_data)
+
+def _start_watcher():
+    global _watcher
+    from backend.cv_watcher import FileWatcher
+    
+    with _lock:
+        if _watcher is None:
+            _watcher = FileWatcher([CV_DATA_FILE, *SECRETS_FILES], reload_cv, CV_RELOAD_INTERVAL)
+            _watcher.start()
+
+def _invalidate(chatbot: "CVChatbot"):
+    """Drop the cached answers of a replaced chatbot; they belong to the old CV."""
+    if chatbot.cache is not None:
+        chatbot.cache.clear()
+    if chatbot.semantic_cache is not None:
+        chatbot.semantic_cache.clear()
+
+def get_engine() -> "AsyncEngine":
+    """Return the shared async engine that limits upstream concurrency."""
+    global _engine
+    from backend.async_chatbot import AsyncEngine
+    
+    if _engine is None:
+        with _lock:
+            if _engine is None:
+                _engine = AsyncEngine()
+    return _engine
+
+def get_async_chatbot(chatbot: "CVChatbot") -> "AsyncCVChatbot":
+    """Return the async variant of a shared chatbot, running on the shared engine."""
+    from backend.async_chatbot import AsyncCVChatbot
+    
+    async_chatbot = chatbot.async_chatbot
+    if async_chatbot is None:
+        engine = get_engine()
+        with _lock:
+            async_chatbot = chatbot.async_chatbot
+            if async_chatbot is None:
+                # Kept on the chatbot itself, so both are freed together once
+                # nothing else refers to them (an evicted tenant, a replaced CV)
+                async_chatbot = AsyncCVChatbot(chatbot, engine)
+                chatbot.async_chatbot = async_chatbot
+    return async_chatbot
+
+def get_summarizer() -> "ConversationSummarizer":
+    """Return the shared conversation summarizer."""
+    global _summarizer
+    from backend.summarizer import ConversationSummarizer
+    
+    if _summarizer is None:
+        with _lock:
+            if _summarizer is None:
+                _summarizer = ConversationSummarizer(get_client(), engine=get_engine())
+    return _summarizer
+
+def get_rate_limiter() -> "RateLimiter":
+    """Return the shared rate limiter; its state is shared with other processes through SQLite."""
+    global _rate_limiter
+    from backend.rate_limit import RateLimiter
+    
+    if _rate_limiter is None:
+        with _lock:
+            if _rate_limiter is None:
+                _rate_limiter = RateLimiter(
+                    RATE_LIMIT_PATH,
+                    requests_per_hour=MAX_REQUESTS_PER_HOUR,
+                    tokens_per_day=MAX_TOKENS_PER_DAY,
+                    global_tokens_per_day=GLOBAL_MAX_TOKENS_PER_DAY
+                )
+    return _rate_limiter
+
+def get_tenant(name: Optional[str]) -> Optional[Tuple["Profile", "CVChatbot"]]:
+    """
+    Return (profile, chatbot) for a profile of the multi-tenant mode, or None if unknown.
+    
+    All tenants share the HTTP client, async engine, rate limiter and disk
+    answer cache file; each has its own prompt, retrieval index and caches.
+    """
+    global _tenants
+    from backend.tenants import TenantRegistry, load_profile
+    
+    if _tenants is None:
+        with _lock:
+            if _tenants is None:
+                defaults = {
+                    "title": APP_TITLE,
+                    "icon": APP_ICON,
+                    "model": DEFAULT_MODEL,
+                    "suggested_questions": get_suggested_questions()
+                }
+                _tenants = TenantRegistry(
+                    loader=lambda profile_name: load_profile(PROFILES_DIR, profile_name, defaults),
+                    factory=_build_tenant,
+                    max_active=MAX_ACTIVE_TENANTS
+                )
+    return _tenants.get(name) if name else None
+
+def _build_tenant(profile: "Profile") -> "CVChatbot":
+    from backend.chatbot import CVChatbot
+    from backend.warmup import start_warm_up
+    
+    chatbot = CVChatbot(profile.cv_data, model=profile.model)
+    if WARMUP_ENABLED:
+        start_warm_up(chatbot, profile.suggested_questions)
+    return chatbot
+
+def reset():
+    """Drop all shared instances (e.g. after configuration changes)."""
+    global _client, _chatbots
+    with _lock:
+        _chatbots = {}
+        if _tenants is not None:
+            _tenants.clear()
+        _client = None
+    invalidate_config()
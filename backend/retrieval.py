@@ -0,0 +1,112 @@
+import re
+import math
+from collections import Counter
+from typing import List, Dict, Any
+
+_TOKEN = re.compile(r"\w+")
+
+# Very common words carry no signal for picking a CV section
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "did", "do", "does",
+    "for", "from", "has", "have", "he", "her", "his", "how", "i", "in", "is",
+    "it", "me", "of", "on", "or", "she", "tell", "that", "the", "their", "they",
+    "this", "to", "was", "what", "when", "where", "which", "who", "with", "you"
+}
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords; apostrophes are dropped first."""
+    text = re.sub(r"['’`´]", "", text.lower())
+    return [token for token in _TOKEN.findall(text) if token not in _STOPWORDS]
+
+def split_sections(cv_data: str) -> List[Dict[str, str]]:
+    """
+    Split CV text into sections on markdown "## " headers.
+    
+    Text before the first header (name, contact details) becomes a section
+    with an empty title.
+    
+    Returns:
+        List of {"title": ..., "text": ...} in document order
+    """
+    sections = []
+    title = ""
+    lines: List[str] = []
+    
+    for line in cv_data.splitlines():
+        if line.startswith("## "):
+            if title or "".join(lines).strip():
+                sections.append({"title": title, "text": "\n".join(lines).strip()})
+            title = line[3:].strip()
+            lines = [line]
+        else:
+            lines.append(line)
+    
+    if title or "".join(lines).strip():
+        sections.append({"title": title, "text": "\n".join(lines).strip()})
+    
+    return sections
+
+class CVRetriever:
+    """BM25 index over CV sections, used to pick the context for a question."""
+    
+    def __init__(self, cv_data: str, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.sections = split_sections(cv_data)
+        
+        # Section titles are weighted by repeating them in the indexed text
+        self._term_freqs = [
+            Counter(tokenize(f"{section['title']} {section['title']} {section['text']}"))
+            for section in self.sections
+        ]
+        self._lengths = [sum(tf.values()) for tf in self._term_freqs]
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+        
+        doc_freqs = Counter()
+        for tf in self._term_freqs:
+            doc_freqs.update(tf.keys())
+        n = len(self.sections)
+        self._idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in doc_freqs.items()
+        }
+    
+    def score(self, query: str) -> List[float]:
+        """BM25 score of every section for the query."""
+        terms = tokenize(query)
+        scores = []
+        for tf, length in zip(self._term_freqs, self._lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / self._avg_length) if self._avg_length else self.k1
+            total = 0.0
+            for term in terms:
+                freq = tf.get(term)
+                if freq:
+                    total += self._idf[term] * freq * (self.k1 + 1) / (freq + norm)
+            scores.append(total)
+        return scores
+    
+    def search(self, query: str, top_k: int = 3) -> List[Dict[str, Any]]:
+        """Return the top_k matching sections (score > 0), best first."""
+        ranked = sorted(enumerate(self.score(query)), key=lambda item: item[1], reverse=True)
+        return [
+            dict(self.sections[index], index=index, score=score)
+            for index, score in ranked[:top_k]
+            if score > 0
+        ]
+    
+    def build_context(self, query: str, top_k: int = 3) -> str:
+        """
+        Build the CV context for a question from the most relevant sections.
+        
+        The untitled leading section (name, contact) is always included and
+        sections keep their original order. Returns an empty string when no
+        section matches, so callers can fall back to the full CV.
+        """
+        hits = self.search(query, top_k)
+        if not hits:
+            return ""
+        
+        selected = {hit["index"] for hit in hits}
+        if self.sections and not self.sections[0]["title"]:
+            selected.add(0)
+        return "\n\n".join(self.sections[i]["text"] for i in sorted(selected))
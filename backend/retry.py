@@ -0,0 +1,145 @@
+import time
+import random
+import asyncio
+from email.utils import parsedate_to_datetime
+from typing import List, Dict, Any, Optional, Callable, Awaitable, Tuple
+from config.settings import RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY
+
+# Error categories worth another attempt
+RETRYABLE = {"rate_limit", "overloaded", "timeout", "server", "connection"}
+
+class RetryExhausted(Exception):
+    """Raised when a call failed and no further attempt is allowed."""
+    
+    def __init__(self, last_error: BaseException, category: str, attempts: List[Dict[str, Any]]):
+        super().__init__(str(last_error))
+        self.last_error = last_error
+        self.category = category
+        self.attempts = attempts
+
+def classify_error(error: BaseException) -> str:
+    """
+    Classify an upstream error.
+    
+    Returns one of "rate_limit", "overloaded", "timeout", "server",
+    "connection", "client" or "unknown".
+    """
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+        return "timeout"
+    
+    name = type(error).__name__
+    if name == "APITimeoutError":
+        return "timeout"
+    if name == "APIConnectionError":
+        return "connection"
+    
+    status = getattr(error, "status_code", None)
+    if status is None:
+        return "unknown"
+    if status == 429:
+        return "rate_limit"
+    if status == 529:
+        return "overloaded"
+    if status in (408, 409):
+        return "timeout"
+    if status >= 500:
+        return "server"
+    return "client"
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Read the server's retry-after hint from an API error, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            # HTTP-date form
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, honoring retry-after and a total deadline."""
+    
+    def __init__(self, max_attempts: int = RETRY_MAX_ATTEMPTS, base_delay: float = RETRY_BASE_DELAY,
+                 max_delay: float = RETRY_MAX_DELAY):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+    
+    def next_delay(self, attempt: int, error: BaseException, remaining: float) -> Optional[float]:
+        """
+        Delay before the next attempt, or None if the call should not be retried.
+        
+        Args:
+            attempt: Number of the attempt that just failed (1-based)
+            error: The error it failed with
+            remaining: Seconds left until the turn's deadline
+        """
+        if attempt >= self.max_attempts or classify_error(error) not in RETRYABLE:
+            return None
+        
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+        hint = retry_after_seconds(error)
+        if hint is not None:
+            delay = max(delay, hint)
+        
+        # Leave time for the next attempt itself
+        if delay >= remaining:
+            return None
+        return delay
+    
+    async def call_async(self, func: Callable[[float], Awaitable[Any]], deadline: float) -> Tuple[Any, List[Dict[str, Any]]]:
+        """
+        Await func(remaining_seconds) until it succeeds or retries are exhausted.
+        
+        Each attempt is bounded by the time left until the deadline.
+        
+        Args:
+            func: The call to make; receives the seconds left until the deadline
+            deadline: Absolute deadline for all attempts, on the running loop's clock
+        
+        Returns:
+            (result, attempts) where attempts holds per-attempt timings
+        
+        Raises:
+            RetryExhausted: If the last attempt failed
+        """
+        loop = asyncio.get_running_loop()
+        attempts: List[Dict[str, Any]] = []
+        attempt = 0
+        while True:
+            attempt += 1
+            started = loop.time()
+            try:
+                remaining = max(0.0, deadline - started)
+                result = await asyncio.wait_for(func(remaining), remaining)
+                attempts.append(attempt_record(attempt, started, loop.time()))
+                return result, attempts
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                finished = loop.time()
+                delay = self.next_delay(attempt, e, deadline - finished)
+                attempts.append(attempt_record(attempt, started, finished, e, delay))
+                if delay is None:
+                    raise RetryExhausted(e, classify_error(e), attempts) from e
+                await asyncio.sleep(delay)
+
+def attempt_record(attempt: int, started: float, finished: float, error: Optional[BaseException] = None,
+                   delay: Optional[float] = None) -> Dict[str, Any]:
+    """Timing entry for one attempt, reported in the response metadata."""
+    record = {"attempt": attempt, "duration": round(finished - started, 3)}
+    if error is not None:
+        record["error"] = classify_error(error)
+        record["retry_in"] = round(delay, 3) if delay is not None else None
+    return record
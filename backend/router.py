@@ -0,0 +1,83 @@
+import re
+from typing import List, Dict, Any
+
+# Phrasings that ask for synthesis, judgement or comparison
+_COMPLEX_PATTERNS = re.compile(
+    r"\b(why|how (would|does|did|could|has)|compare|comparison|differ|difference|fit|suitable|"
+    r"strength|weakness|summar|overview|describe|explain|evaluate|assess|opinion|recommend|"
+    r"tell me (more|about)|what makes|good candidate|leadership|approach|motivat)\w*",
+    re.IGNORECASE
+)
+
+# Short lookups of a single fact: "What is ...'s <thing>?", "Where did ...",
+# yes/no questions and counts. Plural openers ("What are", "Who are") ask
+# for lists and go to the strong model.
+_SIMPLE_PATTERNS = re.compile(
+    r"^((what|which)('s|\s+is|\s+was)|(where|when)\s+(is|was|does|did)|who\s+(is|was)|"
+    r"(is|does|did|has|can)\s+\w+|how\s+(long|many|old))\b",
+    re.IGNORECASE
+)
+
+# Counts have short answers even when they are about a broad topic
+_COUNT_PATTERNS = re.compile(r"^how\s+(long|many|old)\b", re.IGNORECASE)
+
+# Topics whose answers are lists or overviews rather than one fact
+_BROAD_PATTERNS = re.compile(
+    r"\b(experience|projects?|references|skills|background|career|history|responsibilit|achievement|"
+    r"accomplishment|worked on|roles|jobs|positions|education|qualification)\w*",
+    re.IGNORECASE
+)
+
+# Signs that an answer from the fast model is not good enough
+_UNCERTAIN_PATTERNS = re.compile(
+    r"(I('m| am) not (sure|certain)|I can(no|')t (determine|tell)|unclear|I don't have enough)",
+    re.IGNORECASE
+)
+
+class ModelRouter:
+    """
+    Cheap local classifier choosing between a fast and a strong model.
+    
+    Short questions about a single fact go to the fast model; anything that
+    asks for synthesis or a list, or continues an ongoing conversation, goes
+    to the strong one.
+    """
+    
+    def __init__(self, fast_model: str, strong_model: str, max_simple_words: int = 12, min_answer_chars: int = 20):
+        self.fast_model = fast_model
+        self.strong_model = strong_model
+        self.max_simple_words = max_simple_words
+        self.min_answer_chars = min_answer_chars
+    
+    def is_simple(self, question: str, history: List[Dict[str, str]]) -> bool:
+        """Return True if the question looks like a short factual lookup."""
+        question = question.strip()
+        if history:
+            # Follow-ups depend on context and are better left to the strong model
+            return False
+        if len(question.split()) > self.max_simple_words:
+            return False
+        if _COMPLEX_PATTERNS.search(question):
+            return False
+        if _COUNT_PATTERNS.match(question):
+            return True
+        if _BROAD_PATTERNS.search(question):
+            return False
+        return bool(_SIMPLE_PATTERNS.match(question))
+    
+    def route(self, question: str, history: List[Dict[str, str]]) -> str:
+        """Return the model to use for this question."""
+        return self.fast_model if self.is_simple(question, history) else self.strong_model
+    
+    def needs_escalation(self, response: Any) -> bool:
+        """
+        Check a fast-model response and decide whether to ask the strong model.
+        
+        Escalates when the answer was cut off, is suspiciously short or hedges.
+        """
+        if getattr(response, "stop_reason", None) == "max_tokens":
+            return True
+        text = response.content[0].text if response.content else ""
+        if len(text.strip()) < self.min_answer_chars:
+            return True
+        return bool(_UNCERTAIN_PATTERNS.search(text))
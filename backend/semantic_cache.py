@@ -0,0 +1,208 @@
+import time
+import zlib
+import hashlib
+import threading
+from typing import List, Dict, Any, Optional
+import numpy as np
+from backend.cache import normalize_question
+
+# Words that do not change what a question asks for. Question words that
+# do (who, why, how, when, where) and negations are kept.
+_STOPWORDS = frozenset("""
+a an the is are was were be been being am do does did doing have has had having of in on at to for from by with
+about as into i me my you your he him his she her it its we our they them their this that these those there here
+what whats which can could would will shall should may might must please tell know any some much many very just
+also and or so if then main key go going give list show
+""".split())
+
+# Common CV question paraphrases mapped to one word
+_SYNONYMS = {
+    "now": "current", "currently": "current", "present": "current", "presently": "current", "today": "current",
+    "nowadays": "current",
+    "job": "role", "position": "role", "title": "role", "occupation": "role", "do": "role", "doing": "role",
+    "abilities": "skill", "competencies": "skill", "competences": "skill", "expertise": "skill",
+    "studied": "study", "studies": "study", "university": "study", "degree": "study", "degrees": "study",
+    "education": "study", "educational": "study"
+}
+
+def question_keywords(question: str) -> List[str]:
+    """
+    Content words of a question, in order: stopwords dropped, common
+    suffixes stripped and paraphrases mapped to one word.
+    """
+    keywords = []
+    for word in normalize_question(question).split():
+        word = _SYNONYMS.get(word, word)
+        if word in _STOPWORDS:
+            continue
+        if len(word) > 6 and word.endswith("ing"):
+            word = word[:-3]
+        elif len(word) > 5 and word.endswith("ed"):
+            word = word[:-2]
+        elif len(word) > 4 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        keywords.append(_SYNONYMS.get(word, word))
+    return keywords
+
+def _hash(text: str) -> int:
+    return zlib.crc32(text.encode("utf-8"))
+
+class HashingVectorizer:
+    """
+    Word n-gram hashing vectorizer for short questions.
+    
+    Maps the question's keywords and keyword bigrams (weighted by
+    bigram_weight) into a fixed number of buckets and L2-normalizes the
+    result, so cosine similarity is a plain dot product.
+    """
+    
+    def __init__(self, dim: int = 512, bigram_weight: float = 0.5):
+        self.dim = dim
+        self.bigram_weight = bigram_weight
+    
+    def transform(self, keywords: List[str]) -> np.ndarray:
+        """Vectorize a keyword list into a float32 unit vector of length dim."""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in keywords:
+            vector[_hash(word) % self.dim] += 1.0
+        for first, second in zip(keywords, keywords[1:]):
+            vector[_hash(f"{first} {second}") % self.dim] += self.bigram_weight
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+class SemanticCache:
+    """
+    Near-duplicate question cache using cosine similarity of hashed word n-gram vectors.
+    
+    Vectors are stored one row per entry in a matrix that starts small and
+    doubles as entries arrive, up to capacity rows, so an idle cache (e.g.
+    of a rarely visited tenant) takes little memory. A lookup only scores
+    the rows of entries in the same context with the same keywords.
+    Entries only match when their context key (history window, summary,
+    CV fingerprint, model) and their set of keywords are identical, so
+    questions about different facts ("Java" vs "JavaScript") never share
+    an answer however similar they look; the similarity threshold then
+    only has to tell word order apart. The least recently used entry is
+    overwritten when the cache is full; expired entries never match.
+    """
+    
+    INITIAL_ROWS = 64  # Entries allocated up front; doubled whenever full
+    
+    def __init__(self, threshold: float = 0.8, capacity: int = 10000, dim: int = 512, ttl: float = 86400):
+        self.threshold = threshold
+        self.capacity = capacity
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.vectorizer = HashingVectorizer(dim)
+        self._vectors = np.zeros((0, dim), dtype=np.float32)  # One row per entry
+        self._contexts = np.zeros(0, dtype=np.int64)
+        self._keyword_sets = np.zeros(0, dtype=np.int64)
+        self._created = np.zeros(0, dtype=np.float64)
+        self._last_used = np.zeros(0, dtype=np.float64)
+        self._answers = []
+        self._size = 0
+        self._allocate(min(capacity, self.INITIAL_ROWS))
+        self._lock = threading.Lock()
+    
+    def _allocate(self, rows: int):
+        """Resize the per-entry arrays to rows entries, keeping the first _size."""
+        n = self._size
+        
+        def resized(array: np.ndarray) -> np.ndarray:
+            grown = np.zeros((rows,) + array.shape[1:], dtype=array.dtype)
+            grown[:n] = array[:n]
+            return grown
+        
+        self._vectors = resized(self._vectors)
+        self._contexts = resized(self._contexts)
+        self._keyword_sets = resized(self._keyword_sets)
+        self._created = resized(self._created)
+        self._last_used = resized(self._last_used)
+        self._answers = self._answers[:n] + [None] * (rows - n)
+    
+    @staticmethod
+    def _context_id(context_key: str) -> int:
+        # The context key is already a hex digest; 63 bits of it are plenty
+        return int(context_key[:15], 16)
+    
+    @staticmethod
+    def _keyword_set_id(keywords: List[str]) -> int:
+        digest = hashlib.blake2b(" ".join(sorted(set(keywords))).encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big") >> 1
+    
+    def get(self, context_key: str, question: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached answer for the most similar question in the same context.
+        
+        Returns:
+            {"response": ..., "similarity": ...} or None below the threshold
+        """
+        keywords = question_keywords(question)
+        query = self.vectorizer.transform(keywords)
+        context = self._context_id(context_key)
+        keyword_set = self._keyword_set_id(keywords)
+        now = time.time()
+        
+        with self._lock:
+            n = self._size
+            if n == 0 or not keywords:
+                self.misses += 1
+                return None
+            
+            candidates = np.flatnonzero(
+                (self._contexts[:n] == context) & (self._keyword_sets[:n] == keyword_set)
+                & (now - self._created[:n] <= self.ttl)
+            )
+            if len(candidates) == 0:
+                self.misses += 1
+                return None
+            scores = self._vectors[candidates] @ query
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                self.misses += 1
+                return None
+            
+            row = int(candidates[best])
+            self._last_used[row] = now
+            self.hits += 1
+            return {"response": self._answers[row], "similarity": float(scores[best])}
+    
+    def add(self, context_key: str, question: str, answer: str):
+        """Store an answer, replacing the least recently used entry when full."""
+        keywords = question_keywords(question)
+        if not keywords:
+            return
+        vector = self.vectorizer.transform(keywords)
+        now = time.time()
+        
+        with self._lock:
+            if self._size < self.capacity:
+                if self._size == len(self._answers):
+                    self._allocate(min(self.capacity, 2 * self._size))
+                row = self._size
+                self._size += 1
+            else:
+                row = int(np.argmin(self._last_used))
+            self._vectors[row] = vector
+            self._contexts[row] = self._context_id(context_key)
+            self._keyword_sets[row] = self._keyword_set_id(keywords)
+            self._created[row] = now
+            self._last_used[row] = now
+            self._answers[row] = answer
+    
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._size = 0
+            self._allocate(min(self.capacity, self.INITIAL_ROWS))
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": self._size}
+    
+    def __len__(self) -> int:
+        return self._size
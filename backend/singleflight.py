@@ -0,0 +1,130 @@
+import asyncio
+import threading
+from typing import List, Dict, Any, Callable, Iterator, AsyncIterator, Tuple, Optional
+import concurrent.futures
+
+FINAL_EVENTS = ("done", "error")
+
+class Flight:
+    """
+    One in-flight upstream call whose events are shared by every caller.
+    
+    Events are kept in a replay buffer, so callers joining late still see
+    the full stream from the first token.
+    """
+    
+    def __init__(self):
+        self.events = []
+        self.done = False
+        self.subscribers = 0
+        self.future: Optional[concurrent.futures.Future] = None
+        self._cond = threading.Condition()
+        self._waiters: List[asyncio.Future] = []  # Async callers waiting for the next event
+    
+    def publish(self, event: Dict[str, Any]):
+        """Append an event and wake up waiting callers."""
+        with self._cond:
+            if self.done:
+                return
+            self.events.append(event)
+            if event["type"] in FINAL_EVENTS:
+                self.done = True
+            self._cond.notify_all()
+            waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            waiter.get_loop().call_soon_threadsafe(_wake, waiter)
+    
+    def iter_events(self) -> Iterator[Dict[str, Any]]:
+        """Yield all events from the start, blocking until the final one."""
+        index = 0
+        while True:
+            with self._cond:
+                while index >= len(self.events) and not self.done:
+                    self._cond.wait()
+                if index >= len(self.events):
+                    return
+                event = self.events[index]
+            index += 1
+            yield event
+
+    async def aiter_events(self) -> AsyncIterator[Dict[str, Any]]:
+        """Async version of iter_events(); waits without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        index = 0
+        while True:
+            with self._cond:
+                waiter = None
+                if index < len(self.events):
+                    event = self.events[index]
+                elif self.done:
+                    return
+                else:
+                    waiter = loop.create_future()
+                    self._waiters.append(waiter)
+            if waiter is not None:
+                await waiter
+                continue
+            index += 1
+            yield event
+
+def _wake(waiter: asyncio.Future):
+    if not waiter.done():
+        waiter.set_result(None)
+
+class SingleFlight:
+    """
+    Deduplicates concurrent identical requests.
+    
+    The first caller for a key starts the producer; callers arriving while
+    it runs attach to the same Flight instead of starting their own
+    upstream call. The producer is cancelled only when every caller has
+    left before it finished.
+    """
+    
+    def __init__(self):
+        self.started = 0
+        self.coalesced = 0
+        self._flights: Dict[str, Flight] = {}
+        self._lock = threading.Lock()
+    
+    def join(self, key: str, start: Callable[[Flight], concurrent.futures.Future]) -> Tuple[Flight, bool]:
+        """
+        Attach to the flight for key, starting it with start(flight) if none is running.
+        
+        Returns:
+            (flight, leader) where leader is True for the caller that started it
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = Flight()
+                self._flights[key] = flight
+                flight.future = start(flight)
+                self.started += 1
+            else:
+                self.coalesced += 1
+            flight.subscribers += 1
+        return flight, leader
+    
+    def leave(self, key: str, flight: Flight):
+        """Detach a caller; cancel the producer if nobody is left waiting for it."""
+        with self._lock:
+            flight.subscribers -= 1
+            if flight.subscribers == 0 and not flight.done and flight.future is not None:
+                flight.future.cancel()
+                self._discard(key, flight)
+    
+    def finish(self, key: str, flight: Flight):
+        """Called by the producer when it is done; later callers start a new flight."""
+        with self._lock:
+            self._discard(key, flight)
+    
+    def stats(self) -> Dict[str, int]:
+        """Counters of started and coalesced requests."""
+        with self._lock:
+            return {"started": self.started, "coalesced": self.coalesced, "in_flight": len(self._flights)}
+    
+    def _discard(self, key: str, flight: Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
@@ -0,0 +1,60 @@
+import sqlite3
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+
+# Connections per thread, keyed by database path; stores on the same file share them
+_connections = threading.local()
+
+class SQLiteStore:
+    """
+    Base for state kept in a SQLite file shared by every process.
+    
+    Uses WAL mode so readers are not blocked by a writer, one connection
+    per thread and explicit write transactions.
+    """
+    
+    def __init__(self, path: Path, schema: str, busy_timeout: float = 5.0):
+        self.path = Path(path)
+        self.busy_timeout = busy_timeout
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(schema)
+    
+    @contextmanager
+    def _transaction(self):
+        """
+        Write transaction across processes.
+        
+        BEGIN IMMEDIATE takes the write lock up front, so reads made inside
+        the transaction cannot go stale before its writes commit.
+        """
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    
+    def _connection(self) -> sqlite3.Connection:
+        """
+        This thread's connection to the database file.
+        
+        sqlite3 connections must not be shared across threads, but every
+        store on the same file (e.g. the answer caches of many tenants)
+        reuses one connection per thread.
+        """
+        connections = getattr(_connections, "by_path", None)
+        if connections is None:
+            connections = _connections.by_path = {}
+        conn = connections.get(self.path)
+        if conn is None:
+            # Autocommit mode; transactions are explicit
+            conn = sqlite3.connect(str(self.path), timeout=self.busy_timeout, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            connections[self.path] = conn
+        return conn
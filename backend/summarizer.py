@@ -0,0 +1,104 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Tuple
+from config.settings import SUMMARY_MODEL, SUMMARY_TRIGGER_MESSAGES, SUMMARY_KEEP_RECENT, SUMMARY_MAX_TOKENS
+
+SUMMARY_INSTRUCTIONS = """You maintain a running summary of a conversation between a visitor and an assistant that answers questions about a person's CV.
+Merge the existing summary with the new conversation excerpt into one short summary (at most 150 words).
+Keep which topics the visitor asked about and the key facts given in the answers. Write plain prose, no headings."""
+
+class SummaryState:
+    """
+    Per-session rolling summary, stored in st.session_state.
+    
+    Updated from a background thread, so reads and writes go through a lock.
+    `covered` is the number of leading messages folded into `text`.
+    """
+    
+    def __init__(self):
+        self.text = ""
+        self.covered = 0
+        self.pending = False
+        self.tokens_used = 0
+        self._lock = threading.Lock()
+    
+    def snapshot(self) -> Tuple[str, int]:
+        """Return (summary text, number of covered messages) consistently."""
+        with self._lock:
+            return self.text, self.covered
+    
+    def take_tokens(self) -> int:
+        """Return and reset the tokens spent on summarization since the last call."""
+        with self._lock:
+            tokens, self.tokens_used = self.tokens_used, 0
+            return tokens
+
+class ConversationSummarizer:
+    """Folds old conversation turns into a running summary using a cheaper model."""
+    
+    def __init__(self, client, model: str = SUMMARY_MODEL, max_workers: int = 2, engine=None):
+        self.client = client
+        # With an engine, calls share the process-wide concurrency limit
+        self.engine = engine
+        self.model = model
+        self.trigger_messages = SUMMARY_TRIGGER_MESSAGES
+        self.keep_recent = SUMMARY_KEEP_RECENT
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cv-summary")
+    
+    def maybe_schedule(self, state: SummaryState, messages: List[Dict[str, str]]) -> bool:
+        """
+        Schedule a background summary update if enough unsummarized turns piled up.
+        
+        Never blocks the caller. Returns True if an update was scheduled.
+        """
+        with state._lock:
+            if state.pending or len(messages) - state.covered <= self.trigger_messages:
+                return False
+            
+            # Fold everything except the most recent turns; stop on an
+            # assistant message so the remaining history starts with a user turn
+            end = len(messages) - self.keep_recent
+            while end > state.covered and messages[end - 1]["role"] != "assistant":
+                end -= 1
+            if end <= state.covered:
+                return False
+            
+            state.pending = True
+            previous_summary, start = state.text, state.covered
+        
+        excerpt = [dict(msg) for msg in messages[start:end]]
+        self._pool.submit(self._update, state, previous_summary, excerpt, end)
+        return True
+    
+    async def _create_async(self, request):
+        """Make the summarization call on the engine loop, inside a limiter slot."""
+        async with self.engine.slot():
+            return await self.engine.client.messages.create(**request)
+    
+    def _update(self, state: SummaryState, previous_summary: str, excerpt: List[Dict[str, str]], end: int):
+        """Run the summarization call and publish the result."""
+        try:
+            transcript = "\n".join(f"{msg['role'].capitalize()}: {msg['content']}" for msg in excerpt)
+            request = {
+                "model": self.model,
+                "max_tokens": SUMMARY_MAX_TOKENS,
+                "system": SUMMARY_INSTRUCTIONS,
+                "messages": [{
+                    "role": "user",
+                    "content": f"Existing summary:\n{previous_summary or '(none)'}\n\nNew conversation excerpt:\n{transcript}"
+                }]
+            }
+            if self.engine is not None:
+                response = self.engine.run(self._create_async(request))
+            else:
+                response = self.client.messages.create(**request)
+            with state._lock:
+                state.text = response.content[0].text.strip()
+                state.covered = end
+                state.tokens_used += response.usage.input_tokens + response.usage.output_tokens
+        except Exception as e:
+            # Keep the old summary; the turns are retried on the next schedule
+            print(f"Conversation summary failed: {e}")
+        finally:
+            with state._lock:
+                state.pending = False
@@ -0,0 +1,115 @@
+import re
+import json
+import threading
+from collections import OrderedDict, namedtuple
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable
+
+# One CV profile served in multi-tenant mode
+Profile = namedtuple("Profile", ["name", "cv_data", "title", "icon", "model", "suggested_questions"])
+
+# Profile names come from the URL, so they must never reach outside the profiles directory
+_PROFILE_NAME = re.compile(r"^[a-z0-9][a-z0-9_-]{0,63}$")
+
+def load_profile(profiles_dir: Path, name: str, defaults: Dict[str, Any]) -> Optional[Profile]:
+    """
+    Load a profile from profiles_dir/<name>/.
+    
+    The directory holds cv_data.txt and optionally profile.json with
+    "title", "icon", "model" and "suggested_questions"; missing values are
+    taken from defaults.
+    
+    Returns:
+        The profile, or None if the name is invalid or it does not exist
+    """
+    if not name or not _PROFILE_NAME.match(name):
+        return None
+    directory = Path(profiles_dir) / name
+    try:
+        with open(directory / "cv_data.txt", 'r', encoding='utf-8') as f:
+            cv_data = f.read()
+    except FileNotFoundError:
+        return None
+    
+    options = dict(defaults)
+    try:
+        with open(directory / "profile.json", 'r', encoding='utf-8') as f:
+            options.update(json.load(f))
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Error loading profile settings for {name}: {e}")
+    
+    return Profile(
+        name=name,
+        cv_data=cv_data,
+        title=options["title"],
+        icon=options["icon"],
+        model=options["model"],
+        suggested_questions=list(options["suggested_questions"])
+    )
+
+class TenantRegistry:
+    """
+    Lazily loaded, LRU-evicted chatbots, one per CV profile.
+    
+    Only the max_active most recently used profiles are kept in memory, so
+    memory grows with the number of active tenants, not with the number of
+    profiles on disk. Evicted tenants are loaded again on their next visit;
+    their answers survive in the shared disk cache.
+    """
+    
+    def __init__(self, loader: Callable[[str], Optional[Profile]], factory: Callable[[Profile], Any],
+                 max_active: int = 50):
+        self.loader = loader
+        self.factory = factory
+        self.max_active = max_active
+        self.loads = 0
+        self.evictions = 0
+        self._tenants: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._build_locks: Dict[str, threading.Lock] = {}
+    
+    def get(self, name: str) -> Optional[tuple]:
+        """Return (profile, chatbot) for a profile name, loading it on first use; None if unknown."""
+        with self._lock:
+            tenant = self._tenants.get(name)
+            if tenant is not None:
+                self._tenants.move_to_end(name)
+                return tenant
+            build_lock = self._build_locks.setdefault(name, threading.Lock())
+        
+        # Load outside the registry lock so other tenants are not held up;
+        # concurrent first visits to the same profile build it once
+        with build_lock:
+            with self._lock:
+                tenant = self._tenants.get(name)
+            if tenant is None:
+                profile = self.loader(name)
+                if profile is None:
+                    with self._lock:
+                        self._build_locks.pop(name, None)
+                    return None
+                tenant = (profile, self.factory(profile))
+                with self._lock:
+                    self.loads += 1
+                    self._tenants[name] = tenant
+                    while len(self._tenants) > self.max_active:
+                        evicted, _ = self._tenants.popitem(last=False)
+                        self._build_locks.pop(evicted, None)
+                        self.evictions += 1
+        return tenant
+    
+    def names(self) -> List[str]:
+        """Profiles currently in memory, least recently used first."""
+        with self._lock:
+            return list(self._tenants)
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"active": len(self._tenants), "loads": self.loads, "evictions": self.evictions}
+    
+    def clear(self):
+        with self._lock:
+            self._tenants.clear()
+            self._build_locks.clear()
@@ -0,0 +1,66 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+from backend.prompts import get_suggested_questions
+from config.settings import WARMUP_MAX_WORKERS
+
+# Fingerprints of CV versions that already have a warm-up running or done
+_started = set()
+_lock = threading.Lock()
+
+def warm_up(chatbot, questions: Optional[List[str]] = None, max_workers: int = WARMUP_MAX_WORKERS) -> Dict[str, Any]:
+    """
+    Precompute answers for the given questions (default: suggested questions).
+    
+    Answers land in the chatbot's answer cache under the same key a first
+    click on the question produces (empty history). Runs at most
+    max_workers model calls at a time.
+    
+    Returns:
+        Dictionary with counts of warmed, already cached, locally answered
+        and failed questions
+    """
+    questions = questions if questions is not None else get_suggested_questions()
+    summary = {"warmed": 0, "cached": 0, "local": 0, "failed": 0}
+    if chatbot.cache is None:
+        return summary
+    
+    # Go through the async engine so warm-up respects the global concurrency limit
+    from backend.registry import get_async_chatbot
+    async_chatbot = get_async_chatbot(chatbot)
+    
+    def warm(question: str) -> str:
+        result = async_chatbot.get_response_sync(question, [])
+        if not result["success"]:
+            return "failed"
+        if result.get("extractive"):
+            return "local"  # Answered without a model call; nothing to warm
+        return "cached" if result.get("cached") else "warmed"
+    
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cv-warmup") as pool:
+        for outcome in pool.map(warm, questions):
+            summary[outcome] += 1
+    
+    return summary
+
+def start_warm_up(chatbot, questions: Optional[List[str]] = None) -> bool:
+    """
+    Start warm_up() in a background thread, once per CV version.
+    
+    Returns immediately so the first page render is never blocked.
+    Returns True if a new warm-up was started.
+    """
+    with _lock:
+        if chatbot.cv_fingerprint in _started:
+            return False
+        _started.add(chatbot.cv_fingerprint)
+    
+    def run():
+        try:
+            summary = warm_up(chatbot, questions)
+            print(f"Answer cache warm-up finished: {summary}")
+        except Exception as e:
+            print(f"Answer cache warm-up failed: {e}")
+    
+    threading.Thread(target=run, name="cv-warmup", daemon=True).start()
+    return True
@@ -1,20 +1,128 @@
 import os
+import time
+import threading
+from collections import namedtuple
 from pathlib import Path
+from typing import Optional
+from dotenv import load_dotenv
 
 # Project paths
 PROJECT_ROOT = Path(__file__).parent.parent
 DATA_DIR = PROJECT_ROOT / "data"
 CV_DATA_FILE = DATA_DIR / "cv_data.txt"
+FAQ_FILE = DATA_DIR / "faq.json"  # Optional offline answers: {"question": "answer"}
+SECRETS_FILES = [PROJECT_ROOT / ".streamlit" / "secrets.toml", Path.home() / ".streamlit" / "secrets.toml"]
+
+# Watch CV_DATA_FILE and SECRETS_FILES and swap in a rebuilt chatbot when the CV changes
+CV_RELOAD_ENABLED = True
+CV_RELOAD_INTERVAL = 5.0  # seconds between checks
+
+# Multi-tenant mode: serve many CVs from one process, selected with
+# ?profile=<name>; each profile is PROFILES_DIR/<name>/cv_data.txt plus an
+# optional profile.json ("title", "icon", "model", "suggested_questions")
+MULTI_TENANT_ENABLED = False
+PROFILES_DIR = DATA_DIR / "profiles"
+MAX_ACTIVE_TENANTS = 50  # Profiles kept in memory, least recently used evicted
+
+# Headless HTTP API (api.py)
+API_HOST = "127.0.0.1"
+API_PORT = 8000
+API_MAX_MESSAGE_CHARS = 4000
 
 # Application settings
 APP_TITLE = "Chat with Pauls CV and references"
 APP_ICON = ""
 SESSION_TIMEOUT = 3600  # 1 hour
+MAX_FRAGMENT_MESSAGES = 10  # Turns drawn by the chat fragment before a full rerun redraws the chat
+
+# Stylesheet: STYLESHEET_SOURCE is minified into STATIC_DIR/app.<hash>.min.css,
+# which Streamlit serves under app/static/ (server.enableStaticServing)
+STYLESHEET_SOURCE = PROJECT_ROOT / "assets" / "app.css"
+STATIC_DIR = PROJECT_ROOT / "static"
+FONTS_URL = "https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap"
+
+# Password checks: bcrypt runs on a small pool, successful checks are
+# remembered briefly, and clients failing too often are turned away
+AUTH_MAX_WORKERS = 2
+AUTH_MAX_PENDING = 16  # Checks waiting for a worker before new ones are refused
+AUTH_CACHE_TTL = 300  # seconds
+AUTH_MAX_FAILURES = 5  # Failed attempts per client within AUTH_FAILURE_WINDOW
+AUTH_FAILURE_WINDOW = 300  # seconds
+# Reverse proxies in front of the app that append the client address to
+# X-Forwarded-For. With N, the address appended by the outermost of them is
+# used. Clients can write anything into the header, so never set this higher
+# than the real count. With 0, only direct connections from public addresses
+# are told apart; behind a proxy (e.g. *.streamlit.app) logins and rate
+# limits are then not throttled per address at all rather than for everyone.
+TRUSTED_PROXY_HOPS = 0
 
 # Anthropic API settings
-DEFAULT_MODEL = "claude-3-5-sonnet-20241022"
+DEFAULT_MODEL = "claude-3-7-sonnet-latest"  # Strong model for synthesis questions
 MAX_TOKENS = 1000
+
+# Model cascade: short factual lookups go to FAST_MODEL and are escalated to
+# DEFAULT_MODEL when the answer looks cut off, too short or uncertain
+ROUTING_ENABLED = True
+FAST_MODEL = "claude-3-5-haiku-latest"
+FAST_MAX_TOKENS = 400
+
+# Answer direct factual lookups from the parsed CV without any model call
+EXTRACTIVE_ENABLED = True
+MAX_CONCURRENT_REQUESTS = 8  # Upstream requests in flight across all sessions
+REQUEST_TIMEOUT = 60  # Seconds per turn, including time queued for a slot and retries
+
+# Retries of transient upstream errors (rate limit, overloaded, timeout, 5xx)
+RETRY_MAX_ATTEMPTS = 4
+RETRY_BASE_DELAY = 0.5  # Seconds; doubles per attempt, with full jitter
+RETRY_MAX_DELAY = 8.0
+
+# Circuit breaker: fail fast and answer from the local FAQ store during outages
+BREAKER_WINDOW = 20  # Recent calls considered
+BREAKER_MIN_CALLS = 5  # Calls needed before the breaker can trip
+BREAKER_FAILURE_RATE = 0.5
+BREAKER_SLOW_CALL_SECONDS = 30.0
+BREAKER_SLOW_CALL_RATE = 0.8
+BREAKER_OPEN_SECONDS = 30.0  # Time before a probe call is let through
 MAX_CONVERSATION_LENGTH = 20  # Maximum number of messages to keep in history
+HISTORY_TOKEN_BUDGET = 4000  # Estimated input tokens available for history per request
+
+# Rolling summary of older turns, produced in the background by a cheaper model
+SUMMARY_MODEL = FAST_MODEL
+SUMMARY_TRIGGER_MESSAGES = 12  # Unsummarized messages before the oldest are folded
+SUMMARY_KEEP_RECENT = 6  # Newest messages always sent verbatim
+SUMMARY_MAX_TOKENS = 300
+
+# Prompt caching: the system prompt (full CV) is identical on every turn.
+# Only used with CONTEXT_MODE = "full"; retrieved context changes per question.
+ENABLE_PROMPT_CACHING = True
+CACHE_CONVERSATION_HISTORY = True  # Also mark the history prefix as cacheable
+
+# Answer cache in front of the model (keyed on question, history and CV)
+ANSWER_CACHE_ENABLED = True
+ANSWER_CACHE_TTL = 24 * 3600  # seconds
+ANSWER_CACHE_MAX_ENTRIES = 1000
+ANSWER_CACHE_MAX_BYTES = 16 * 1024 * 1024
+# "disk" keeps answers in a SQLite file shared by all processes and kept
+# across restarts; "memory" keeps them per process
+ANSWER_CACHE_BACKEND = "disk"
+ANSWER_CACHE_PATH = DATA_DIR / "answer_cache.sqlite3"
+
+# Paraphrase cache: cosine similarity of hashed keyword n-gram vectors,
+# among cached questions with exactly the same keywords. Pairs with equal
+# keywords but reordered words score 0.86-0.93; 0.8 keeps those.
+SEMANTIC_CACHE_ENABLED = True
+SEMANTIC_CACHE_THRESHOLD = 0.8
+SEMANTIC_CACHE_CAPACITY = 10000  # Entries; vectors take DIM * 4 bytes each (2 KB), allocated as entries arrive
+SEMANTIC_CACHE_DIM = 512
+
+# Context selection: "full" sends the whole CV, "retrieval" only the
+# RETRIEVAL_TOP_K most relevant "## " sections for each question
+CONTEXT_MODE = "full"
+RETRIEVAL_TOP_K = 3
+
+# Precompute answers to the suggested questions in the background at startup
+WARMUP_ENABLED = True
+WARMUP_MAX_WORKERS = 3  # Concurrent model calls during warm-up
 
 # UI settings
 THEME_CONFIG = {
@@ -24,9 +132,17 @@ THEME_CONFIG = {
     "textColor": "#ffffff"
 }
 
-# Rate limiting (optional)
+# Rate limiting: token buckets per session, login token and client address, plus a
+# daily token budget shared by everyone; state is kept in RATE_LIMIT_PATH
+RATE_LIMIT_ENABLED = True
 MAX_REQUESTS_PER_HOUR = 50
 MAX_TOKENS_PER_DAY = 10000
+GLOBAL_MAX_TOKENS_PER_DAY = 500000
+# Prompt cache reads and writes count at their billed rate relative to plain
+# input tokens; a cached CV prompt would otherwise use up a day in two questions
+CACHE_READ_TOKEN_WEIGHT = 0.1
+CACHE_WRITE_TOKEN_WEIGHT = 1.25
+RATE_LIMIT_PATH = DATA_DIR / "rate_limits.sqlite3"
 
 def load_cv_data() -> str:
     """Load CV data and references from Streamlit secrets or file fallback."""
@@ -60,4 +176,54 @@ def load_cv_data() -> str:
     except FileNotFoundError:
         return "CV data not found. Please add CV_DATA and optionally REFERENCES to Streamlit secrets or data/cv_data.txt file."
     except Exception as e:
-        return f"Error loading CV data: {str(e)}"
\ No newline at end of file
+        return f"Error loading CV data: {str(e)}"
+
+# Values read from secrets, the environment (plus .env) and the CV file,
+# loaded once per process by get_config()
+ConfigSnapshot = namedtuple(
+    "ConfigSnapshot",
+    ["cv_data", "password_hash", "access_password", "session_secret", "anthropic_api_key", "loaded_at"]
+)
+
+_config_lock = threading.Lock()
+_config: Optional[ConfigSnapshot] = None
+
+def _read_secret(name: str) -> Optional[str]:
+    """Read a value from Streamlit secrets, falling back to the environment."""
+    try:
+        import streamlit as st
+        if name in st.secrets:
+            return st.secrets[name]
+    except Exception:
+        pass
+    return os.getenv(name)
+
+def get_config() -> ConfigSnapshot:
+    """
+    Return the process-wide configuration snapshot, loading it on first use.
+    
+    Sessions read secrets and CV text from here instead of probing
+    st.secrets, .env and the file system each time. Call invalidate_config()
+    after changing them.
+    """
+    global _config
+    if _config is None:
+        with _config_lock:
+            if _config is None:
+                # Variables already set in the environment take precedence over .env
+                load_dotenv()
+                _config = ConfigSnapshot(
+                    cv_data=load_cv_data(),
+                    password_hash=_read_secret("PASSWORD_HASH") or None,
+                    access_password=os.getenv("ACCESS_PASSWORD", "default_password"),
+                    session_secret=_read_secret("SESSION_SECRET") or None,
+                    anthropic_api_key=_read_secret("ANTHROPIC_API_KEY") or None,
+                    loaded_at=time.time()
+                )
+    return _config
+
+def invalidate_config():
+    """Drop the snapshot so the next get_config() reloads secrets and CV text."""
+    global _config
+    with _config_lock:
+        _config = None
@@ -0,0 +1,29 @@
+from backend.assets import build_stylesheet, minify_css
+
+def test_removes_comments_and_whitespace():
+    css = "/* header */\n.a  >  .b {\n    color: red;\n    margin: 0 auto;\n}\n"
+    assert minify_css(css) == ".a>.b{color:red;margin:0 auto}"
+
+def test_keeps_quoted_strings_intact():
+    css = '[style*="rgb(0, 0, 0)"] { content: \'a ;  b { } /* c */\'; }'
+    assert minify_css(css) == '[style*="rgb(0, 0, 0)"]{content:\'a ;  b { } /* c */\'}'
+
+def test_quotes_inside_comments_do_not_start_strings():
+    css = "/* don't */ .a { color: red; } /* \"x\" */ .b { color: blue; }"
+    assert minify_css(css) == ".a{color:red}.b{color:blue}"
+
+def test_escaped_quotes_stay_inside_the_string():
+    css = '.a::before { content: "say \\"hi ,  there\\""; }'
+    assert minify_css(css) == '.a::before{content:"say \\"hi ,  there\\""}'
+
+def test_build_stylesheet_writes_a_fingerprinted_file(tmp_path):
+    source = tmp_path / "app.css"
+    source.write_text(".a { color: red; }", encoding="utf-8")
+    static_dir = tmp_path / "static"
+    static_dir.mkdir()
+    (static_dir / "app.000000000000.min.css").write_text("stale", encoding="utf-8")
+    
+    name = build_stylesheet(source, static_dir)
+    assert name.startswith("app.") and name.endswith(".min.css")
+    assert (static_dir / name).read_text(encoding="utf-8") == ".a{color:red}"
+    assert [path.name for path in static_dir.iterdir()] == [name]
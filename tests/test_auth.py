@@ -0,0 +1,68 @@
+import time
+import pytest
+from backend import auth
+from backend.auth import AuthManager, resolve_client_address
+from config.settings import ConfigSnapshot
+
+def use_config(monkeypatch, session_secret="secret", password_hash=None, access_password="password"):
+    config = ConfigSnapshot(cv_data="", password_hash=password_hash, access_password=access_password,
+                            session_secret=session_secret, anthropic_api_key=None, loaded_at=0.0)
+    monkeypatch.setattr(auth, "get_config", lambda: config)
+
+@pytest.fixture
+def manager(monkeypatch):
+    use_config(monkeypatch)
+    return AuthManager()
+
+def test_without_trusted_proxies_a_public_peer_is_used():
+    assert resolve_client_address("203.0.113.7", None, trusted_hops=0) is None  # documentation range, not global
+    assert resolve_client_address("8.8.8.8", None, trusted_hops=0) == "8.8.8.8"
+
+def test_without_trusted_proxies_a_proxy_peer_is_not_trusted():
+    # Behind an undeclared proxy every visitor would share its address
+    assert resolve_client_address("127.0.0.1", None, trusted_hops=0) is None
+    assert resolve_client_address("10.0.0.2", None, trusted_hops=0) is None
+    assert resolve_client_address("8.8.8.8", "1.1.1.1", trusted_hops=0) is None
+    assert resolve_client_address(None, None, trusted_hops=0) is None
+
+def test_uses_the_hop_appended_by_the_trusted_proxy():
+    # The client sent a made-up first entry; the proxy appended the real address
+    assert resolve_client_address("10.0.0.2", "1.2.3.4, 203.0.113.7", trusted_hops=1) == "203.0.113.7"
+    assert resolve_client_address("10.0.0.2", "1.2.3.4, 203.0.113.7, 10.0.0.1", trusted_hops=2) == "203.0.113.7"
+
+def test_missing_header_behind_trusted_proxies_is_not_trusted():
+    # The peer is our own proxy, shared by every visitor
+    assert resolve_client_address("10.0.0.2", None, trusted_hops=1) is None
+
+def test_issued_token_is_valid(manager):
+    token = manager.issue_session_token()
+    issued = manager.validate_session_token(token)
+    assert issued is not None and abs(issued - time.time()) < 5
+    assert manager.is_session_valid(token)
+
+def test_tampered_token_is_rejected(manager):
+    issued, expires, nonce, signature = manager.issue_session_token().split(".")
+    # Pushing the expiry out invalidates the signature
+    assert manager.validate_session_token(f"{issued}.{int(expires) + 3600}.{nonce}.{signature}") is None
+    assert manager.validate_session_token(f"{issued}.{expires}.{nonce}.{manager._sign('other')}") is None
+    assert manager.validate_session_token("garbage") is None
+    assert manager.validate_session_token(None) is None
+
+def test_expired_token_is_rejected(manager, monkeypatch):
+    token = manager.issue_session_token()
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + manager.session_timeout + 1)
+    assert manager.validate_session_token(token) is None
+
+def test_token_is_bound_to_the_signing_key(manager, monkeypatch):
+    token = manager.issue_session_token()
+    use_config(monkeypatch, session_secret="rotated")
+    assert manager.validate_session_token(token) is None
+
+def test_signing_key_falls_back_to_the_password(monkeypatch):
+    use_config(monkeypatch, session_secret=None, access_password="first")
+    token = AuthManager().issue_session_token()
+    assert AuthManager().validate_session_token(token) is not None
+    # Changing the password ends every session
+    use_config(monkeypatch, session_secret=None, access_password="second")
+    assert AuthManager().validate_session_token(token) is None
@@ -0,0 +1,50 @@
+import time
+from backend.cache import ResponseCache
+
+def answer(text):
+    return {"success": True, "response": text}
+
+def test_get_returns_stored_value():
+    cache = ResponseCache()
+    cache.set("key", answer("a"))
+    assert cache.get("key") == answer("a")
+    assert cache.get("other") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    cache = ResponseCache(ttl=60)
+    cache.set("key", answer("a"))
+    now[0] += 60
+    assert cache.get("key") is not None
+    now[0] += 1
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+def test_evicts_least_recently_used_entry():
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", answer("a"))
+    cache.set("b", answer("b"))
+    cache.get("a")
+    cache.set("c", answer("c"))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+def test_byte_cap_evicts_oldest_and_skips_oversized_values():
+    entry_size = ResponseCache._estimate_size("a", answer("x" * 100))
+    cache = ResponseCache(max_bytes=2 * entry_size + 10)
+    for key in "abc":
+        cache.set(key, answer("x" * 100))
+    assert len(cache) == 2 and cache.get("a") is None
+    assert cache.stats()["bytes"] <= cache.max_bytes
+    
+    cache.set("huge", answer("x" * 10000))
+    assert cache.get("huge") is None and len(cache) == 2
+
+def test_replacing_a_key_keeps_the_byte_count():
+    cache = ResponseCache()
+    cache.set("a", answer("x" * 100))
+    cache.set("a", answer("x" * 100))
+    assert len(cache) == 1
+    assert cache.stats()["bytes"] == ResponseCache._estimate_size("a", answer("x" * 100))
@@ -0,0 +1,109 @@
+from backend.circuit_breaker import CircuitBreaker
+
+def make_breaker(**kwargs):
+    options = dict(window=4, min_calls=4, failure_rate=0.5, slow_call_seconds=10.0, slow_call_rate=0.8,
+                   open_seconds=0.0)
+    options.update(kwargs)
+    return CircuitBreaker(**options)
+
+def trip(breaker):
+    for _ in range(4):
+        admission = breaker.allow_request()
+        assert admission.allowed
+        breaker.record_failure(0.1, admission)
+
+def test_stays_closed_below_min_calls():
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.record_failure(0.1, breaker.allow_request())
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_trips_on_failure_rate():
+    breaker = make_breaker()
+    breaker.record_success(0.1, breaker.allow_request())
+    breaker.record_success(0.1, breaker.allow_request())
+    breaker.record_failure(0.1, breaker.allow_request())
+    breaker.record_failure(0.1, breaker.allow_request())
+    assert breaker.state == CircuitBreaker.OPEN
+
+def test_trips_on_slow_calls():
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record_success(30.0, breaker.allow_request())
+    assert breaker.state == CircuitBreaker.OPEN
+
+def test_open_rejects_until_open_seconds_passed():
+    breaker = make_breaker(open_seconds=3600)
+    trip(breaker)
+    assert not breaker.allow_request().allowed
+    assert breaker.stats()["rejected"] == 1
+
+def test_half_open_lets_one_probe_through():
+    breaker = make_breaker()
+    trip(breaker)
+    admission = breaker.allow_request()
+    assert admission.allowed and admission.probe
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow_request().allowed
+
+def test_probe_success_closes():
+    breaker = make_breaker()
+    trip(breaker)
+    breaker.record_success(0.1, breaker.allow_request())
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.stats()["calls"] == 0
+
+def test_probe_failure_reopens():
+    breaker = make_breaker()
+    trip(breaker)
+    probe = breaker.allow_request()
+    breaker.open_seconds = 3600
+    breaker.record_failure(0.1, probe)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request().allowed
+
+def test_probe_without_outcome_frees_the_slot():
+    # E.g. a client error or an abandoned stream: neither success nor failure is recorded
+    breaker = make_breaker()
+    trip(breaker)
+    probe = breaker.allow_request()
+    breaker.release(probe)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request().allowed
+
+def test_release_after_outcome_is_a_no_op():
+    breaker = make_breaker()
+    trip(breaker)
+    probe = breaker.allow_request()
+    breaker.record_success(0.1, probe)
+    breaker.release(probe)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_call_from_before_the_trip_does_not_free_the_probe_slot():
+    breaker = make_breaker()
+    slow_call = breaker.allow_request()
+    trip(breaker)
+    probe = breaker.allow_request()
+    assert probe.probe and not slow_call.probe
+    breaker.release(slow_call)
+    assert not breaker.allow_request().allowed
+
+def test_call_from_before_the_trip_does_not_close_the_circuit():
+    breaker = make_breaker()
+    slow_call = breaker.allow_request()
+    trip(breaker)
+    breaker.allow_request()
+    breaker.record_success(0.1, slow_call)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.record_failure(0.1, slow_call)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+def test_probe_release_does_not_free_a_later_probe():
+    breaker = make_breaker()
+    trip(breaker)
+    first = breaker.allow_request()
+    breaker.record_failure(0.1, first)
+    second = breaker.allow_request()
+    assert second.probe
+    breaker.release(first)
+    assert not breaker.allow_request().allowed
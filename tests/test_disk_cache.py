@@ -0,0 +1,87 @@
+import sys
+import time
+import sqlite3
+import subprocess
+from pathlib import Path
+import pytest
+from backend.disk_cache import DiskCache
+
+ROOT = Path(__file__).parent.parent
+
+def answer(text):
+    return {"success": True, "response": text}
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "answers.sqlite3"
+
+def test_namespaces_are_separate(path):
+    first = DiskCache(path, namespace="cv1:model")
+    second = DiskCache(path, namespace="cv2:model")
+    first.set("key", answer("first"))
+    assert first.get("key") == answer("first")
+    assert second.get("key") is None
+    
+    second.set("key", answer("second"))
+    first.clear()
+    assert first.get("key") is None
+    assert second.get("key") == answer("second")
+
+def test_entries_expire_after_ttl(path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    cache = DiskCache(path, namespace="cv:model", ttl=60)
+    cache.set("key", answer("a"))
+    now[0] += 61
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+def test_evicts_least_recently_used_across_namespaces(path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    first = DiskCache(path, namespace="cv1:model", max_entries=2)
+    second = DiskCache(path, namespace="cv2:model", max_entries=2)
+    first.set("a", answer("a"))
+    now[0] += DiskCache.TOUCH_INTERVAL + 1
+    second.set("b", answer("b"))
+    now[0] += DiskCache.TOUCH_INTERVAL + 1
+    assert first.get("a") is not None
+    second.set("c", answer("c"))
+    assert second.get("b") is None
+    assert first.get("a") is not None and second.get("c") is not None
+
+def test_byte_cap_evicts_oldest(path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    cache = DiskCache(path, namespace="cv:model", max_bytes=500)
+    for key in "abc":
+        cache.set(key, answer("x" * 150))
+        now[0] += 1
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] <= 500
+
+def test_shared_between_processes(path):
+    cache = DiskCache(path, namespace="cv:model")
+    script = (
+        "import sys; from pathlib import Path; from backend.disk_cache import DiskCache; "
+        "DiskCache(Path(sys.argv[1]), namespace='cv:model').set('key', {'success': True, 'response': 'other'})"
+    )
+    subprocess.run([sys.executable, "-c", script, str(path)], cwd=ROOT, check=True)
+    assert cache.get("key") == answer("other")
+
+def test_database_errors_never_fail(path):
+    cache = DiskCache(path, namespace="cv:model", busy_timeout=0.05)
+    cache.set("key", answer("a"))
+    
+    # Another process holding the write lock: the answer is not cached
+    other = sqlite3.connect(str(path), isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    cache.set("other", answer("b"))
+    other.execute("ROLLBACK")
+    assert cache.get("other") is None
+    
+    # A broken file: reads are misses
+    other.execute("DROP TABLE answers")
+    other.close()
+    assert cache.get("key") is None
+    assert cache.stats()["entries"] is None
@@ -0,0 +1,59 @@
+import pytest
+from backend.extractive import ExtractiveAnswerer
+
+CV = """# Paul Example
+Email: paul@example.com | Phone: +49 170 1234567 | linkedin.com/in/paul
+
+## Experience
+- Senior Engineer, ACME GmbH (2021 - present)
+- Engineer, Foo AG, 2018 - 2021
+
+## Skills
+Languages: Python, Java, JavaScript
+Tools: Docker, Git
+
+## Education
+- M.Sc. Computer Science, TU Munich
+
+## References
+### Dr. Jane Smith
+"""
+
+@pytest.fixture(scope="module")
+def answerer():
+    return ExtractiveAnswerer(CV)
+
+def test_date_ranges_are_not_phone_numbers(answerer):
+    assert answerer.profile.phones == ["+49 170 1234567"]
+
+@pytest.mark.parametrize("question, expected", [
+    ("What is Pauls email?", "paul@example.com"),
+    ("What's Paul's email address?", "paul@example.com"),
+    ("What is Pauls phone number?", "+49 170 1234567"),
+    ("What is Paul's LinkedIn profile?", "linkedin.com/in/paul"),
+    ("What is Pauls current role?", "Senior Engineer, ACME GmbH"),
+    ("What does Paul do now?", "Senior Engineer, ACME GmbH"),
+    ("Where does Paul work?", "Senior Engineer, ACME GmbH"),
+    ("What are Pauls main technical skills?", "JavaScript"),
+    ("Which technologies does Paul know?", "Docker"),
+    ("Where did Paul study?", "TU Munich"),
+    ("Who are Pauls professional references?", "Dr. Jane Smith"),
+])
+def test_answers_plain_lookups(answerer, question, expected):
+    answer = answerer.answer(question)
+    assert answer is not None and expected in answer
+
+@pytest.mark.parametrize("question", [
+    "Can I call Paul?",
+    "Is Paul currently looking for a new job?",
+    "What was Pauls role before his current position?",
+    "What skills does Paul lack?",
+    "experience with tools like Kubernetes?",
+    "Does Paul have a GitHub?",
+    "What is Paul's GitHub?",  # Not in the CV
+    "What is Pauls professional experience?",
+    "What projects has Paul worked on?",
+    "Why is Paul a good fit for the team?",
+])
+def test_leaves_everything_else_to_the_model(answerer, question):
+    assert answerer.answer(question) is None
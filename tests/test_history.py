@@ -0,0 +1,34 @@
+from backend.history import build_history_window
+
+def turn(role, content):
+    return {"role": role, "content": content}
+
+def test_keeps_newest_messages_within_budget():
+    history = [turn("user", "a" * 40), turn("assistant", "b" * 40), turn("user", "c" * 40), turn("assistant", "d" * 40)]
+    # 10 tokens per message
+    window = build_history_window(history, token_budget=25, max_messages=10)
+    assert window == history[2:]
+
+def test_respects_max_messages():
+    history = [turn("user", "q"), turn("assistant", "a")] * 5
+    window = build_history_window(history, token_budget=1000, max_messages=4)
+    assert len(window) == 4
+
+def test_starts_with_user_and_ends_with_assistant():
+    history = [turn("assistant", "hello"), turn("user", "q1"), turn("assistant", "a1"), turn("user", "unanswered")]
+    window = build_history_window(history, token_budget=1000, max_messages=10)
+    assert window == [turn("user", "q1"), turn("assistant", "a1")]
+
+def test_odd_cut_drops_leading_assistant():
+    history = [turn("user", "q1"), turn("assistant", "a1"), turn("user", "q2"), turn("assistant", "a2")]
+    window = build_history_window(history, token_budget=1000, max_messages=3)
+    assert window == history[2:]
+
+def test_merges_consecutive_messages_of_one_role():
+    history = [turn("user", "q1"), turn("user", "q2"), turn("assistant", "a")]
+    window = build_history_window(history, token_budget=1000, max_messages=10)
+    assert window == [turn("user", "q1\n\nq2"), turn("assistant", "a")]
+
+def test_empty_history():
+    assert build_history_window(None, token_budget=100, max_messages=10) == []
+    assert build_history_window([], token_budget=100, max_messages=10) == []
@@ -0,0 +1,75 @@
+import pytest
+from backend import rate_limit
+from backend.rate_limit import RateLimiter
+
+@pytest.fixture
+def limiter(tmp_path):
+    return RateLimiter(tmp_path / "limits.sqlite3", requests_per_hour=2, tokens_per_day=1000,
+                       global_tokens_per_day=5000)
+
+def test_requests_per_hour(limiter):
+    assert limiter.check(["session:a"]).allowed
+    assert limiter.check(["session:a"]).allowed
+    decision = limiter.check(["session:a"])
+    assert not decision.allowed
+    assert decision.reason == "requests"
+    assert decision.retry_after > 0
+    # Other identities have their own buckets
+    assert limiter.check(["session:b"]).allowed
+
+def test_refused_check_consumes_nothing(limiter):
+    limiter.check(["session:a"])
+    limiter.check(["session:a"])
+    assert not limiter.check(["session:a", "token:t"]).allowed
+    assert limiter.check(["token:t"]).allowed
+    assert limiter.check(["token:t"]).allowed
+
+def test_tokens_per_day(limiter):
+    assert limiter.check(["session:a"]).allowed
+    limiter.charge_tokens(["session:a"], 1500)
+    decision = limiter.check(["session:a"])
+    assert not decision.allowed
+    assert decision.reason == "tokens"
+
+def test_global_token_budget(limiter):
+    limiter.charge_tokens(["session:a"], 6000)
+    decision = limiter.check(["session:b"])
+    assert not decision.allowed
+    assert decision.reason == "global_tokens"
+
+def test_buckets_refill(limiter, monkeypatch):
+    now = 1_000_000.0
+    monkeypatch.setattr(rate_limit.time, "time", lambda: now)
+    limiter.check(["session:a"])
+    limiter.check(["session:a"])
+    assert not limiter.check(["session:a"]).allowed
+    now += 1800  # Half an hour refills one of two requests
+    assert limiter.check(["session:a"]).allowed
+    assert not limiter.check(["session:a"]).allowed
+
+def test_state_is_shared_through_the_file(limiter, tmp_path):
+    other = RateLimiter(tmp_path / "limits.sqlite3", requests_per_hour=2, tokens_per_day=1000,
+                        global_tokens_per_day=5000)
+    limiter.check(["session:a"])
+    other.check(["session:a"])
+    assert not limiter.check(["session:a"]).allowed
+
+def test_refilled_buckets_are_swept(limiter, monkeypatch):
+    now = 1_000_000.0
+    monkeypatch.setattr(rate_limit.time, "time", lambda: now)
+    limiter.check(["session:a"])
+    limiter.charge_tokens(["session:a"], 10)
+    
+    def keys():
+        return {row[0] for row in limiter._connection().execute("SELECT key FROM buckets")}
+    
+    assert keys() == {"req:session:a", "tok:session:a", "tok:global"}
+    now += 2 * 24 * 3600
+    limiter.check(["session:b"])
+    assert keys() == {"req:session:b", "tok:global"}
+
+def test_prompt_cache_reads_are_charged_at_their_billed_rate():
+    usage = {"input": 100, "output": 50, "cache_read": 5000, "cache_write": 0, "total": 5150}
+    assert rate_limit.billed_tokens(usage) == 650
+    usage = {"input": 100, "output": 50, "cache_read": 0, "cache_write": 4000, "total": 4150}
+    assert rate_limit.billed_tokens(usage) == 5150
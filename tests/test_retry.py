@@ -0,0 +1,61 @@
+import random
+import asyncio
+import pytest
+from backend.retry import RetryPolicy, RetryExhausted
+
+class APIError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = type("Response", (), {"headers": headers or {}})()
+
+@pytest.fixture(autouse=True)
+def seeded_random():
+    random.seed(0)
+
+def test_retryable_errors_back_off_within_bounds():
+    policy = RetryPolicy(max_attempts=5, base_delay=0.5, max_delay=2.0)
+    for attempt, cap in [(1, 0.5), (2, 1.0), (3, 2.0), (4, 2.0)]:
+        delay = policy.next_delay(attempt, APIError(529), remaining=60)
+        assert delay is not None and 0 <= delay <= cap
+
+def test_client_errors_are_not_retried():
+    policy = RetryPolicy()
+    assert policy.next_delay(1, APIError(400), remaining=60) is None
+
+def test_no_retry_after_last_attempt():
+    policy = RetryPolicy(max_attempts=3)
+    assert policy.next_delay(3, APIError(500), remaining=60) is None
+
+def test_retry_after_header_is_honored():
+    policy = RetryPolicy(base_delay=0.1, max_delay=0.1)
+    assert policy.next_delay(1, APIError(429, {"retry-after": "3"}), remaining=60) == 3.0
+
+def test_no_retry_past_the_deadline():
+    policy = RetryPolicy()
+    assert policy.next_delay(1, APIError(429, {"retry-after": "30"}), remaining=5) is None
+
+def test_call_retries_until_success():
+    policy = RetryPolicy(max_attempts=3, base_delay=0.0, max_delay=0.0)
+    outcomes = [APIError(503), APIError(503), "ok"]
+    
+    async def func(remaining):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    
+    result, attempts = asyncio.run(policy.call_async(func, deadline=float("inf")))
+    assert result == "ok"
+    assert len(attempts) == 3
+
+def test_call_raises_when_exhausted():
+    policy = RetryPolicy(max_attempts=2, base_delay=0.0, max_delay=0.0)
+    
+    async def func(remaining):
+        raise APIError(500)
+    
+    with pytest.raises(RetryExhausted) as info:
+        asyncio.run(policy.call_async(func, deadline=float("inf")))
+    assert info.value.category == "server"
+    assert len(info.value.attempts) == 2
@@ -0,0 +1,33 @@
+import pytest
+from backend.router import ModelRouter
+
+@pytest.fixture
+def router():
+    return ModelRouter("fast", "strong")
+
+@pytest.mark.parametrize("question", [
+    "What is Pauls current role?",
+    "What's Paul's email address?",
+    "Where did Paul study?",
+    "When did Paul start at ACME?",
+    "Does Paul speak German?",
+    "How many years of Python experience does Paul have?",
+])
+def test_single_facts_go_to_the_fast_model(router, question):
+    assert router.route(question, []) == "fast"
+
+@pytest.mark.parametrize("question", [
+    "What is Pauls professional experience?",
+    "What projects has Paul worked on?",
+    "Who are Pauls professional references?",
+    "What are Pauls main technical skills?",
+    "Can you tell me about Pauls education?",
+    "Why would Paul be a good fit for our team?",
+    "Tell me everything about Paul",
+])
+def test_synthesis_and_lists_go_to_the_strong_model(router, question):
+    assert router.route(question, []) == "strong"
+
+def test_follow_ups_go_to_the_strong_model(router):
+    history = [{"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Hello"}]
+    assert router.route("What is Pauls current role?", history) == "strong"
@@ -0,0 +1,64 @@
+import pytest
+from backend.semantic_cache import SemanticCache, question_keywords
+
+CONTEXT = "0" * 64
+
+PARAPHRASES = [
+    ("What is Pauls current role?", "What does Paul do now?"),
+    ("What's Pauls current role", "What is Paul's current role?"),
+    ("Which technical skills does Paul have?", "What are Pauls main technical skills?"),
+    ("Which projects did Paul work on?", "What projects has Paul worked on?"),
+    ("Who are the professional references of Paul?", "Who are Pauls professional references?"),
+    ("How many years of experience with Python does Paul have?", "How many years of Python experience does Paul have?"),
+    ("Where did Paul go to university?", "Where did Paul study?"),
+]
+
+DIFFERENT_FACTS = [
+    ("Does Paul know Java?", "Does Paul know JavaScript?"),
+    ("How many years of Python experience?", "How many years of Java experience?"),
+    ("What is Pauls current role?", "What was Pauls previous role?"),
+    ("What skills does Paul have?", "What skills does Paul lack?"),
+    ("Is Paul good at leadership?", "Is Paul not good at leadership?"),
+    ("Where does Paul live?", "Where does Paul work?"),
+    ("Why did Paul leave his last job?", "When did Paul leave his last job?"),
+]
+
+@pytest.mark.parametrize("cached, asked", PARAPHRASES)
+def test_paraphrases_hit(cached, asked):
+    cache = SemanticCache(threshold=0.8, capacity=16)
+    cache.add(CONTEXT, cached, "answer")
+    match = cache.get(CONTEXT, asked)
+    assert match is not None and match["response"] == "answer"
+
+@pytest.mark.parametrize("cached, asked", DIFFERENT_FACTS)
+def test_different_facts_miss(cached, asked):
+    cache = SemanticCache(threshold=0.8, capacity=16)
+    cache.add(CONTEXT, cached, "answer")
+    assert cache.get(CONTEXT, asked) is None
+
+def test_other_context_misses():
+    cache = SemanticCache(capacity=16)
+    cache.add(CONTEXT, "What is Pauls current role?", "answer")
+    assert cache.get("1" * 64, "What is Pauls current role?") is None
+
+def test_full_cache_replaces_least_recently_used():
+    cache = SemanticCache(capacity=2)
+    cache.add(CONTEXT, "Where did Paul study?", "study")
+    cache.add(CONTEXT, "What is Pauls current role?", "role")
+    assert cache.get(CONTEXT, "Where did Paul study?") is not None
+    cache.add(CONTEXT, "Who are Pauls professional references?", "references")
+    assert cache.get(CONTEXT, "What is Pauls current role?") is None
+    assert cache.get(CONTEXT, "Where did Paul study?")["response"] == "study"
+
+def test_keywords():
+    assert question_keywords("What is Paul's current job?") == ["paul", "current", "role"]
+    assert question_keywords("What is it?") == []
+
+def test_storage_grows_with_entries_up_to_capacity():
+    cache = SemanticCache(capacity=100)
+    assert cache._vectors.shape[0] == SemanticCache.INITIAL_ROWS
+    for i in range(100):
+        cache.add(CONTEXT, f"What did Paul build in project{i}?", f"answer {i}")
+    assert cache._vectors.shape[0] == 100
+    assert cache.get(CONTEXT, "What did Paul build in project0?")["response"] == "answer 0"
+    assert cache.get(CONTEXT, "What did Paul build in project99?")["response"] == "answer 99"
@@ -0,0 +1,80 @@
+import asyncio
+import threading
+import concurrent.futures
+from backend.singleflight import SingleFlight
+
+def test_concurrent_callers_share_one_flight():
+    flights = SingleFlight()
+    starts = []
+    
+    def start(flight):
+        starts.append(flight)
+        return concurrent.futures.Future()
+    
+    first, first_leader = flights.join("key", start)
+    second, second_leader = flights.join("key", start)
+    assert first is second
+    assert (first_leader, second_leader) == (True, False)
+    assert len(starts) == 1
+    assert flights.stats() == {"started": 1, "coalesced": 1, "in_flight": 1}
+
+def test_late_callers_get_the_full_replay():
+    flights = SingleFlight()
+    flight, _ = flights.join("key", lambda flight: concurrent.futures.Future())
+    flight.publish({"type": "text", "text": "Hel"})
+    flight.publish({"type": "text", "text": "lo"})
+    flight.publish({"type": "done", "success": True})
+    flight.publish({"type": "text", "text": "ignored"})
+    assert [event["type"] for event in flight.iter_events()] == ["text", "text", "done"]
+
+def test_blocking_and_async_readers_are_woken():
+    flights = SingleFlight()
+    flight, _ = flights.join("key", lambda flight: concurrent.futures.Future())
+    blocking = []
+    reader = threading.Thread(target=lambda: blocking.extend(flight.iter_events()))
+    reader.start()
+    
+    async def read_async():
+        return [event async for event in flight.aiter_events()]
+    
+    async def main():
+        task = asyncio.ensure_future(read_async())
+        await asyncio.sleep(0.01)
+        # Published from another thread, like the producer on the engine loop
+        producer = threading.Thread(target=lambda: [
+            flight.publish({"type": "text", "text": "a"}),
+            flight.publish({"type": "done", "success": True})
+        ])
+        producer.start()
+        producer.join()
+        return await asyncio.wait_for(task, 5)
+    
+    events = asyncio.run(main())
+    reader.join(5)
+    assert [event["type"] for event in events] == ["text", "done"]
+    assert blocking == events
+
+def test_leave_cancels_producer_once_nobody_waits():
+    flights = SingleFlight()
+    future = concurrent.futures.Future()
+    flight, _ = flights.join("key", lambda flight: future)
+    flights.join("key", lambda flight: future)
+    
+    flights.leave("key", flight)
+    assert not future.cancelled()
+    flights.leave("key", flight)
+    assert future.cancelled()
+    
+    # The next caller starts a fresh flight
+    fresh, leader = flights.join("key", lambda flight: concurrent.futures.Future())
+    assert leader and fresh is not flight
+
+def test_leave_after_finish_does_not_cancel():
+    flights = SingleFlight()
+    future = concurrent.futures.Future()
+    flight, _ = flights.join("key", lambda flight: future)
+    flight.publish({"type": "done", "success": True})
+    flights.finish("key", flight)
+    flights.leave("key", flight)
+    assert not future.cancelled()
+    assert flights.stats()["in_flight"] == 0
@@ -0,0 +1,83 @@
+import json
+import threading
+import pytest
+from backend.tenants import Profile, TenantRegistry, load_profile
+
+DEFAULTS = {"title": "CV", "icon": "", "model": "model", "suggested_questions": ["What is the current role?"]}
+
+def make_profile(name):
+    return Profile(name=name, cv_data=f"CV of {name}", title=name, icon="", model="model", suggested_questions=[])
+
+def make_registry(max_active=2, known=("a", "b", "c")):
+    built = []
+    
+    def factory(profile):
+        built.append(profile.name)
+        return f"chatbot {profile.name}"
+    
+    registry = TenantRegistry(lambda name: make_profile(name) if name in known else None, factory, max_active)
+    return registry, built
+
+@pytest.fixture
+def profiles_dir(tmp_path):
+    (tmp_path / "alice").mkdir()
+    (tmp_path / "alice" / "cv_data.txt").write_text("Alice's CV", encoding="utf-8")
+    (tmp_path / "alice" / "profile.json").write_text(json.dumps({"title": "Alice"}), encoding="utf-8")
+    return tmp_path
+
+def test_load_profile_merges_defaults(profiles_dir):
+    profile = load_profile(profiles_dir, "alice", DEFAULTS)
+    assert profile.cv_data == "Alice's CV"
+    assert profile.title == "Alice"
+    assert profile.suggested_questions == DEFAULTS["suggested_questions"]
+
+@pytest.mark.parametrize("name", ["", "..", "../alice", "alice/../alice", "Alice", "/etc", "a" * 65, "-alice", "bob"])
+def test_load_profile_rejects_invalid_or_unknown_names(profiles_dir, name):
+    assert load_profile(profiles_dir, name, DEFAULTS) is None
+
+def test_loads_each_tenant_once():
+    registry, built = make_registry()
+    profile, chatbot = registry.get("a")
+    assert profile.name == "a" and chatbot == "chatbot a"
+    assert registry.get("a")[1] is chatbot
+    assert built == ["a"]
+
+def test_unknown_profile_is_none():
+    registry, built = make_registry()
+    assert registry.get("unknown") is None
+    assert registry.stats()["active"] == 0
+
+def test_evicts_least_recently_used_tenant():
+    registry, built = make_registry(max_active=2)
+    registry.get("a")
+    registry.get("b")
+    registry.get("a")
+    registry.get("c")
+    assert registry.names() == ["a", "c"]
+    assert registry.stats() == {"active": 2, "loads": 3, "evictions": 1}
+    # Evicted tenants are loaded again on their next visit
+    registry.get("b")
+    assert built == ["a", "b", "c", "b"]
+
+def test_concurrent_first_visits_build_once():
+    started = threading.Event()
+    release = threading.Event()
+    built = []
+    
+    def factory(profile):
+        built.append(profile.name)
+        started.set()
+        release.wait(5)
+        return object()
+    
+    registry = TenantRegistry(make_profile, factory)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("a"))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    started.wait(5)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert built == ["a"]
+    assert len({id(result[1]) for result in results}) == 1